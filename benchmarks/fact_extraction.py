@@ -0,0 +1,75 @@
+"""Per-page cost of extracting the label facts (Language, Level, ...): five find() scans vs. one pass.
+
+Pages are parsed once up front so only fact extraction is timed. Pass cached
+or saved course pages the same way as to parser_diff.py; without arguments
+its built-in pages plus a synthetic ~300 KB page are used:
+
+    PYTHONPATH=src python benchmarks/fact_extraction.py [.cache/http] [page.html ...]
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+import time
+from pathlib import Path
+
+from parse_offload import PAGE
+from parser_diff import load_corpus
+
+from classcentral_crawler.extraction import extract_facts
+from classcentral_crawler.parser_backends import LxmlDocument, SoupDocument
+from classcentral_crawler.parsers import COURSE_PLAN
+
+ROUNDS = 20
+FACT_LABELS = tuple(COURSE_PLAN.fact_patterns)
+
+
+def one_pass(doc: SoupDocument | LxmlDocument) -> dict[str, str | None]:
+    return extract_facts(doc, COURSE_PLAN.fact_patterns)
+
+
+def five_scans(doc: SoupDocument) -> dict[str, str | None]:
+    # grab_fact as it was: a regex compile, a full find() walk and a re.sub per label.
+    facts: dict[str, str | None] = dict.fromkeys(FACT_LABELS)
+    for label in FACT_LABELS:
+        node = doc.soup.find(string=re.compile(label, re.I))
+        if node and node.parent:
+            text = re.sub(label, "", node.parent.get_text(" ", strip=True), flags=re.I).strip(" :-")
+            if text and len(text) < 200:
+                facts[label] = text
+    return facts
+
+
+def bench(fn, docs) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        for doc in docs:
+            fn(doc)
+    return (time.perf_counter() - start) / (ROUNDS * len(docs))
+
+
+def main(argv: list[str]) -> int:
+    corpus = load_corpus([Path(arg) for arg in argv])
+    if not argv:
+        corpus["synthetic-300k"] = PAGE
+    soups = [SoupDocument(html) for html in corpus.values()]
+    trees = [LxmlDocument(html) for html in corpus.values()]
+    for soup, tree in zip(soups, trees):
+        if not five_scans(soup) == one_pass(soup) == one_pass(tree):
+            print("MISMATCH")
+            return 1
+    print(f"{len(corpus)} pages, {ROUNDS} rounds")
+    baseline = bench(five_scans, soups)
+    for name, fn, docs in [
+        ("bs4 five scans", five_scans, soups),
+        ("bs4 one pass", one_pass, soups),
+        ("lxml one pass", one_pass, trees),
+    ]:
+        per_page = baseline if fn is five_scans else bench(fn, docs)
+        print(f"{name:>15} {per_page * 1000:>8.3f} ms/page {baseline / per_page:>6.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
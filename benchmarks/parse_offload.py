@@ -0,0 +1,73 @@
+"""Event loop stalls while parsing large course pages: inline vs. the parse process pool.
+
+A ticker coroutine sleeps 10 ms in a loop and records how late it wakes up
+while ``PAGES`` synthetic ~300 KB pages are parsed through the crawler:
+
+    PYTHONPATH=src python benchmarks/parse_offload.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+from classcentral_crawler.config import CrawlConfig
+from classcentral_crawler.crawler import ClassCentralCrawler
+
+PAGES = 16
+TICK = 0.01
+
+ROW = (
+    "<li class='catalog-row'><a href='/course/example-{i}'>Example course {i}</a>"
+    "<span class='rating'><span class='value'>4.{d}</span></span><p>Some description text for row {i}.</p></li>\n"
+)
+PAGE = (
+    "<html><head><meta name='description' content='A large page'></head><body><h1>Large page</h1>"
+    "<div class='course-provider'><a>edX</a></div><ul>"
+    + "".join(ROW.format(i=i, d=i % 10) for i in range(1700))
+    + "</ul><ul><li>Language: English</li><li>Level: Beginner</li></ul></body></html>"
+)
+
+
+async def measure(workers: int) -> None:
+    crawler = ClassCentralCrawler(CrawlConfig(cache_dir=None, state_path=None, parse_workers=workers))
+    response = httpx.Response(200, content=PAGE.encode(), headers={"content-type": "text/html; charset=utf-8"})
+    # Warm up outside the measurement (imports, spawning the pool).
+    await asyncio.gather(*(crawler._parse("https://www.classcentral.com/course/x", response) for _ in range(max(workers, 1))))
+
+    lags: list[float] = []
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        while not done.is_set():
+            expected = time.perf_counter() + TICK
+            await asyncio.sleep(TICK)
+            lags.append(time.perf_counter() - expected)
+
+    async def parse_all() -> None:
+        url = "https://www.classcentral.com/course/x"
+        await asyncio.gather(*(crawler._parse(url, response) for _ in range(PAGES)))
+        done.set()
+
+    start = time.perf_counter()
+    await asyncio.gather(ticker(), parse_all())
+    elapsed = time.perf_counter() - start
+    await crawler.aclose()
+    p99 = statistics.quantiles(lags, n=100)[98] if len(lags) > 1 else lags[0]
+    label = "inline" if workers == 0 else f"pool={workers}"
+    print(f"{label:>8} {elapsed:>8.2f}s {max(lags) * 1000:>10.1f} ms {p99 * 1000:>10.1f} ms")
+
+
+async def main() -> None:
+    print(f"{PAGES} pages of {len(PAGE) // 1024} KiB on {os.cpu_count()} cores")
+    print(f"{'mode':>8} {'wall':>9} {'max lag':>13} {'p99 lag':>13}")
+    await measure(0)
+    await measure(max((os.cpu_count() or 1) - 1, 1))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+"""Differential check and timing of the parse_course backends.
+
+Every page is parsed with each backend and the records must match field for
+field. Besides a few built-in edge-case pages, the corpus can be ``.html``
+files, directories of them, or the HTTP cache directory (``.cache/http``):
+
+    PYTHONPATH=src python benchmarks/parser_diff.py [PATH ...]
+
+Exits non-zero on the first mismatch.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import sys
+import time
+import zlib
+from dataclasses import asdict
+from pathlib import Path
+
+from classcentral_crawler.parser_backends import BACKENDS
+from classcentral_crawler.parsers import parse_course
+
+BASE_URL = "https://www.classcentral.com"
+
+FIXTURES = {
+    "full": """<!doctype html><html><head>
+<meta name="description" content="Learn things &amp; more">
+<meta property="og:image" content="https://img.example/x.png">
+<script type="Application/LD+JSON">{"@type": "Course", "name": "JSON title",
+ "aggregateRating": {"ratingValue": "4.5", "reviewCount": 12}, "offers": {"price": 0, "priceCurrency": "USD"}}</script>
+</head><body>
+<h1> Intro to <em>Things</em>
+</h1>
+<div class="course-provider"><a href="/p">Coursera</a></div>
+<div class="a	instructor
+"><a>Jane <b>Doe</b></a><a> </a><a>John</a></div>
+<div data-name="institution"><a>MIT</a></div>
+<span class="rating"><span class="value">4.7 stars</span><span class="count">1,234 reviews</span></span>
+<a class="btn btn-go-to-class" href="/redirect/1">Go</a>
+<ul><li><strong>Language</strong>: English</li><li>Level: <script>var level = 1</script>Beginner</li>
+<li><!-- Duration hint -->Duration 6 weeks</li></ul>
+<template><p>Price: hidden</p></template>
+<p>Certificate<ruby>x<rt>Paid</rt></ruby> available</p>
+</body></html>""",
+    "jsonld_only": """<html><head><script type="application/ld+json">[{"@type": "Thing"},
+{"@type": "Product", "name": "P", "description": "D", "image": "https://img.example/p.png",
+ "provider": {"name": "Prov"}, "offers": {"price": "49", "priceCurrency": "EUR"},
+ "aggregateRating": {"ratingValue": 3, "reviewCount": "7"}}]</script></head><body></body></html>""",
+    "top_level_comment": "<!-- Language: outside --><html><body><p>Language: inside</p></body></html>",
+    "broken": "<div><p>Level<b>Advanced<p>Duration: 2 h</div></span><a data-track='x-provider-y'>edX</a>",
+    "script_text": "<html><body><script>Language = 'js'</script><style>.level{}</style><p>Level: Mixed</p></body></html>",
+    "empty": "",
+}
+
+
+def load_corpus(paths: list[Path]) -> dict[str, str]:
+    corpus = dict(FIXTURES)
+    for path in paths:
+        if (path / "index.sqlite3").exists():
+            db = sqlite3.connect(path / "index.sqlite3")
+            for url, digest in db.execute("SELECT url, digest FROM entries WHERE url LIKE '%/course/%'"):
+                try:
+                    corpus[url] = zlib.decompress((path / "bodies" / digest[:2] / digest).read_bytes()).decode()
+                except (OSError, zlib.error, UnicodeDecodeError):
+                    continue
+            db.close()
+        elif path.is_dir():
+            corpus.update({str(p): p.read_text(errors="replace") for p in sorted(path.rglob("*.html"))})
+        else:
+            corpus[str(path)] = path.read_text(errors="replace")
+    return corpus
+
+
+def main(argv: list[str]) -> int:
+    corpus = load_corpus([Path(arg) for arg in argv])
+    backends = list(BACKENDS)
+    timings = dict.fromkeys(backends, 0.0)
+    for name, html in corpus.items():
+        url = name if name.startswith("http") else f"{BASE_URL}/course/{Path(name).stem}"
+        records = {}
+        for backend in backends:
+            start = time.perf_counter()
+            records[backend] = asdict(parse_course(url, html, BASE_URL, backend=backend))
+            timings[backend] += time.perf_counter() - start
+        reference = records[backends[0]]
+        for backend in backends[1:]:
+            diff = {k: (v, records[backend][k]) for k, v in reference.items() if records[backend][k] != v}
+            if diff:
+                print(f"MISMATCH {name} ({backends[0]} vs {backend}):")
+                for key, (expected, got) in diff.items():
+                    print(f"  {key}: {expected!r} != {got!r}")
+                return 1
+    print(f"{len(corpus)} pages identical across {', '.join(backends)}")
+    for backend in backends:
+        print(f"{backend:>6} {timings[backend] * 1000:>9.1f} ms {timings[backend] * 1000 / len(corpus):>7.2f} ms/page")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
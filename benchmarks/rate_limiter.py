@@ -0,0 +1,42 @@
+"""Achieved vs. configured rate of AsyncRateLimiter for different numbers of waiters.
+
+    PYTHONPATH=src python benchmarks/rate_limiter.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from classcentral_crawler.rate_limiter import AsyncRateLimiter
+
+RATE = 200.0
+REQUESTS = 1000
+
+
+async def measure(waiters: int, burst: int) -> float:
+    limiter = AsyncRateLimiter(RATE, burst=burst)
+    remaining = REQUESTS
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            await limiter.wait()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(waiters)))
+    return REQUESTS / (time.perf_counter() - start)
+
+
+async def main() -> None:
+    print(f"configured rate: {RATE:.0f} req/s, {REQUESTS} requests")
+    print(f"{'waiters':>8} {'burst':>6} {'achieved':>10} {'ratio':>7}")
+    for waiters in (1, 50, 500):
+        for burst in (1, 20):
+            achieved = await measure(waiters, burst)
+            print(f"{waiters:>8} {burst:>6} {achieved:>10.1f} {achieved / RATE:>7.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,72 @@
+"""Peak RSS of scraping a synthetic 100k URL catalog: gather-over-everything vs. the worker pool.
+
+Network and parsing are replaced by a stub so only scheduling overhead is measured.
+Each mode runs in its own process so the peaks don't mix:
+
+    PYTHONPATH=src python benchmarks/scheduler_memory.py
+"""
+
+from __future__ import annotations
+
+import asyncio
+import resource
+import subprocess
+import sys
+import time
+
+from classcentral_crawler.config import CrawlConfig
+from classcentral_crawler.crawler import ClassCentralCrawler
+from classcentral_crawler.models import CourseRecord
+
+URLS = 100_000
+CONCURRENCY = 50
+
+
+class StubCrawler(ClassCentralCrawler):
+    async def _scrape_single_course(self, url: str) -> CourseRecord:
+        await asyncio.sleep(0)
+        return CourseRecord(url=url, title="t" * 40, description="d" * 400, instructors=["someone"])
+
+
+async def run_gather(crawler: StubCrawler, urls: list[str]) -> int:
+    # The scheduler as it was: one coroutine per URL and every record kept until the end.
+    sem = asyncio.Semaphore(CONCURRENCY)
+
+    async def run(url: str) -> CourseRecord | None:
+        async with sem:
+            return await crawler._scrape_single_course(url)
+
+    results = await asyncio.gather(*(run(url) for url in urls))
+    return len([r for r in results if r])
+
+
+async def run_pool(crawler: StubCrawler, urls: list[str]) -> int:
+    count = 0
+    async for _ in crawler.stream_courses(urls):
+        count += 1
+    return count
+
+
+async def measure(mode: str) -> None:
+    crawler = StubCrawler(CrawlConfig(concurrency=CONCURRENCY, cache_dir=None, state_path=None))
+    urls = [f"https://www.classcentral.com/course/synthetic-{i}" for i in range(URLS)]
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    count = await (run_gather if mode == "gather" else run_pool)(crawler, urls)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    await crawler.aclose()
+    print(f"{mode:>7} {count:>8} {elapsed:>8.2f}s {peak / 1024:>9.1f} MiB {(peak - baseline) / 1024:>9.1f} MiB")
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        asyncio.run(measure(sys.argv[1]))
+        return
+    print(f"{'mode':>7} {'records':>8} {'time':>9} {'peak RSS':>13} {'growth':>13}")
+    for mode in ("gather", "pool"):
+        subprocess.run([sys.executable, __file__, mode], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import math
+import time
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import orjson
+
+PAGE_PARAMS = ("page", "p", "pageNumber", "page_number", "pg")
+OFFSET_PARAMS = ("offset", "start", "from", "skip")
+PAGE_SIZE_KEYS = ("per_page", "perPage", "page_size", "pageSize", "hitsPerPage", "limit", "size")
+TOTAL_KEYS = ("total", "totalCount", "total_count", "totalResults", "total_results", "nbHits", "totalHits", "count")
+
+
+@dataclass(slots=True)
+class ApiEndpoint:
+    """A listing API endpoint and how it paginates.
+
+    ``url`` has the pagination parameter removed; ``page_url`` puts it back
+    as either a page number or an item offset.
+    """
+
+    url: str
+    page_param: str = "page"
+    offset_based: bool = False
+    first_page: int = 1
+    page_size: int | None = None
+    total_field: str | None = None
+    total: int | None = None
+
+    @property
+    def page_count(self) -> int | None:
+        if not self.total or not self.page_size:
+            return None
+        return math.ceil(self.total / self.page_size)
+
+    def page_url(self, page: int) -> str:
+        """URL of the 1-based ``page``."""
+        if self.offset_based:
+            value = (page - 1) * (self.page_size or 0)
+        else:
+            value = self.first_page + page - 1
+        parts = urlsplit(self.url)
+        query = parse_qsl(parts.query, keep_blank_values=True) + [(self.page_param, str(value))]
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+    def read_total(self, payload: Any) -> int | None:
+        if self.total_field is None:
+            return None
+        node = payload
+        for key in self.total_field.split("."):
+            if not isinstance(node, dict):
+                return None
+            node = node.get(key)
+        return _as_count(node)
+
+
+def _as_count(value: Any) -> int | None:
+    if isinstance(value, dict):
+        # Elasticsearch style {"value": 1234, "relation": "eq"}
+        value = value.get("value")
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return None
+
+
+def _find_key(payload: Any, keys: Iterable[str], path: str = "") -> tuple[str, int] | None:
+    """Shallowest ``path, count`` whose last key is one of ``keys``, breadth first."""
+    wanted = set(keys)
+    level: list[tuple[str, Any]] = [(path, payload)]
+    while level:
+        following: list[tuple[str, Any]] = []
+        for prefix, node in level:
+            if not isinstance(node, dict):
+                continue
+            for key, value in node.items():
+                child = f"{prefix}.{key}" if prefix else key
+                if key in wanted and (count := _as_count(value)) is not None:
+                    return child, count
+                if isinstance(value, dict):
+                    following.append((child, value))
+        level = following
+    return None
+
+
+def _largest_item_list(payload: Any) -> int:
+    best = 0
+    stack = [payload]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            if node and all(isinstance(item, dict) for item in node):
+                best = max(best, len(node))
+            stack.extend(node)
+    return best
+
+
+def infer_endpoint(url: str, payload: Any) -> ApiEndpoint:
+    """Infer the pagination scheme of ``url`` from its query string and one JSON ``payload``."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    page_param, offset_based, first_page = "page", False, 1
+    for key, value in query:
+        if key in PAGE_PARAMS:
+            page_param = key
+            if value == "0":
+                first_page = 0
+            break
+        if key in OFFSET_PARAMS:
+            page_param, offset_based = key, True
+            break
+    rest = urlencode([(k, v) for k, v in query if k != page_param])
+    endpoint = ApiEndpoint(
+        urlunsplit((parts.scheme, parts.netloc, parts.path, rest, "")),
+        page_param=page_param,
+        offset_based=offset_based,
+        first_page=first_page,
+    )
+    declared = _find_key(payload, PAGE_SIZE_KEYS)
+    endpoint.page_size = declared[1] if declared else (_largest_item_list(payload) or None)
+    total = _find_key(payload, TOTAL_KEYS)
+    if total and (endpoint.page_size is None or total[1] >= endpoint.page_size):
+        endpoint.total_field, endpoint.total = total
+    return endpoint
+
+
+def load_api_profile(path: Path) -> list[ApiEndpoint]:
+    try:
+        data = orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return []
+    return [ApiEndpoint(**item) for item in data.get("endpoints", [])]
+
+
+def save_api_profile(path: Path, endpoints: Iterable[ApiEndpoint]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"saved_at": time.time(), "endpoints": [asdict(e) for e in endpoints]}
+    path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+import orjson
+
+# Stored bodies are already decoded, so these must not be replayed.
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "keep-alive"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers BLOB NOT NULL,
+    digest TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at);
+CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest);
+"""
+
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, ""))
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    url: str
+    status_code: int
+    headers: dict[str, str]
+    content: bytes
+    stored_at: float
+    expires_at: float
+
+    def to_response(self) -> httpx.Response:
+        return httpx.Response(
+            self.status_code,
+            headers=self.headers,
+            content=self.content,
+            request=httpx.Request("GET", self.url),
+        )
+
+
+class ResponseCache:
+    """On-disk HTTP response cache.
+
+    Bodies are zlib-compressed and stored once per content digest; an SQLite
+    index maps normalized URLs to them with a per-entry expiry. The least
+    recently used entries are evicted once the bodies exceed ``max_bytes``.
+    """
+
+    def __init__(self, directory: Path, ttl_seconds: float, max_bytes: int) -> None:
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._bodies = directory / "bodies"
+        self._bodies.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(directory / "index.sqlite3", check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        row = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT digest, size FROM entries)").fetchone()
+        self._total_bytes = int(row[0])
+
+    @staticmethod
+    def _key(url: str) -> str:
+        return hashlib.sha256(normalize_url(url).encode()).hexdigest()
+
+    def _body_path(self, digest: str) -> Path:
+        return self._bodies / digest[:2] / digest
+
+    def get(self, url: str, *, allow_stale: bool = False) -> CachedResponse | None:
+        key = self._key(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, headers, digest, stored_at, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            status, headers, digest, stored_at, expires_at = row
+            if not allow_stale and time.time() >= expires_at:
+                return None
+            try:
+                content = zlib.decompress(self._body_path(digest).read_bytes())
+            except (OSError, zlib.error):
+                self._delete(key, digest)
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        return CachedResponse(url, status, orjson.loads(headers), content, stored_at, expires_at)
+
+    def put(self, url: str, response: httpx.Response) -> None:
+        if response.status_code != 200:
+            return
+        cache_control = response.headers.get("cache-control", "").lower()
+        if "no-store" in cache_control:
+            return
+        blob = zlib.compress(response.content)
+        digest = hashlib.sha256(blob).hexdigest()
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS}
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        key = self._key(url)
+        with self._lock:
+            old = self._db.execute("SELECT digest FROM entries WHERE key = ?", (key,)).fetchone()
+            if old is not None:
+                self._delete(key, old[0])
+            if not self._db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+                path = self._body_path(digest)
+                path.parent.mkdir(exist_ok=True)
+                path.write_bytes(blob)
+                self._total_bytes += len(blob)
+            self._db.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, response.status_code, orjson.dumps(headers), digest, len(blob), now, expires_at, now),
+            )
+            self._evict()
+            self._db.commit()
+
+    def touch(self, url: str) -> None:
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._db.execute(
+                "UPDATE entries SET expires_at = ?, accessed_at = ? WHERE key = ?", (expires_at, now, self._key(url))
+            )
+            self._db.commit()
+
+    def _delete(self, key: str, digest: str) -> None:
+        row = self._db.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+        self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        if row is None or self._db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone():
+            return
+        self._body_path(digest).unlink(missing_ok=True)
+        self._total_bytes -= row[0]
+
+    def _evict(self) -> None:
+        if self._total_bytes <= self.max_bytes:
+            return
+        # Evict down to a low watermark so a full cache doesn't evict on every put.
+        target = self.max_bytes * 0.9
+        while self._total_bytes > target:
+            rows = self._db.execute("SELECT key, digest FROM entries ORDER BY accessed_at LIMIT 256").fetchall()
+            if not rows:
+                break
+            for key, digest in rows:
+                self._delete(key, digest)
+                if self._total_bytes <= target:
+                    break
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
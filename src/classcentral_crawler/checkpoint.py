@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from .models import CourseRecord
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, done INTEGER NOT NULL DEFAULT 0);
+CREATE TABLE IF NOT EXISTS records (url TEXT PRIMARY KEY, record BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+"""
+
+
+class CheckpointStore:
+    """Periodic snapshot of one crawl: discovered URLs, completed URLs and their records.
+
+    Updates are buffered in memory until ``flush``, which the crawler runs off
+    the event loop every few seconds, so a crash loses only the work done
+    since the last flush.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(_SCHEMA)
+        self._discovered: list[str] = []
+        self._completed: list[tuple[str, bytes]] = []
+
+    def reset(self) -> None:
+        with self._lock:
+            self._discovered.clear()
+            self._completed.clear()
+            self._db.executescript("DELETE FROM urls; DELETE FROM records; DELETE FROM meta;")
+
+    def add_discovered(self, urls: Iterable[str]) -> None:
+        with self._lock:
+            self._discovered.extend(urls)
+
+    def complete(self, url: str, record: CourseRecord) -> None:
+        data = record.to_bytes()
+        with self._lock:
+            self._completed.append((url, data))
+
+    def mark_discovery_complete(self) -> None:
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('discovery_complete', '1')")
+        self.flush()
+
+    @property
+    def discovery_complete(self) -> bool:
+        return self._db.execute("SELECT 1 FROM meta WHERE key = 'discovery_complete'").fetchone() is not None
+
+    def pending_urls(self) -> list[str]:
+        return [url for (url,) in self._db.execute("SELECT url FROM urls WHERE done = 0")]
+
+    def completed_urls(self) -> list[str]:
+        return [url for (url,) in self._db.execute("SELECT url FROM urls WHERE done = 1")]
+
+    def records(self) -> Iterator[CourseRecord]:
+        for (record,) in self._db.execute("SELECT record FROM records"):
+            yield CourseRecord.from_bytes(record)
+
+    def flush(self) -> None:
+        with self._lock:
+            discovered, self._discovered = self._discovered, []
+            completed, self._completed = self._completed, []
+            self._db.executemany("INSERT OR IGNORE INTO urls (url) VALUES (?)", ((url,) for url in discovered))
+            self._db.executemany(
+                "INSERT INTO urls VALUES (?, 1) ON CONFLICT (url) DO UPDATE SET done = 1",
+                ((url,) for url, _ in completed),
+            )
+            self._db.executemany("INSERT OR REPLACE INTO records VALUES (?, ?)", completed)
+            self._db.commit()
+
+    def close(self) -> None:
+        self.flush()
+        with self._lock:
+            self._db.close()
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 
@@ -8,14 +8,56 @@ from pathlib import Path
 class CrawlConfig:
     base_url: str = "https://www.classcentral.com"
     listing_path: str = "/subject"
+    sitemap_path: str = "/sitemap.xml"
+    discovery: str = "browser"
+    api_profile_path: Path = Path(".cache/api_profile.json")
+    api_prefetch_pages: int = 4
     output_dir: Path = Path("output")
     max_listing_pages: int = 200
+    listing_page_pool: int = 4
+    max_scroll_rounds: int = 30
+    scroll_stable_rounds: int = 3
+    scroll_settle_timeout_seconds: float = 10.0
+    scroll_quiet_seconds: float = 0.5
     headless: bool = True
+    block_requests: bool = True
+    blocked_resource_types: tuple[str, ...] = ("image", "media", "font")
+    allowed_hosts: tuple[str, ...] = ("classcentral.com",)
     concurrency: int = 5
     rate_limit_per_sec: float = 1.5
+    rate_limit_burst: int = 1
+    adaptive_rate: bool = False
+    min_rate_per_sec: float = 0.2
+    max_rate_per_sec: float = 10.0
+    rate_increase_per_sec: float = 0.05
+    rate_decrease_factor: float = 0.5
+    latency_target_seconds: float = 2.0
+    offsite_rate_limit_per_sec: float = 2.0
+    offsite_concurrency: int = 2
+    host_rate_limits: dict[str, float] = field(default_factory=dict)
+    checkpoint_interval_seconds: float = 30.0
+    resume: bool = False
     max_retries: int = 4
     timeout_seconds: int = 35
+    http2: bool = True
+    keepalive_seconds: float = 30.0
+    cache_dir: Path | None = Path(".cache/http")
+    cache_ttl_seconds: float = 7 * 24 * 3600
+    cache_max_bytes: int = 2 * 1024**3
+    state_path: Path | None = Path(".cache/state.sqlite3")
+    incremental: bool = False
+    parser_backend: str = "bs4"
+    parse_workers: int | None = None
+    jsonld_fast_path: bool = False
 
     @property
     def listing_url(self) -> str:
         return f"{self.base_url}{self.listing_path}"
+
+    @property
+    def sitemap_url(self) -> str:
+        return f"{self.base_url}{self.sitemap_path}"
+
+    @property
+    def checkpoint_path(self) -> Path:
+        return self.output_dir / "checkpoint.sqlite3"
@@ -1,42 +1,200 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import json
 import logging
-from collections.abc import Iterable
-from typing import Any
-from urllib.parse import parse_qs, urljoin, urlparse
+import multiprocessing
+import os
+import time
+import zlib
+from collections import Counter
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Any
+from urllib.parse import parse_qsl, urljoin, urlparse, urlsplit
 
 import httpx
 from bs4 import BeautifulSoup
-from playwright.async_api import BrowserContext, Page, async_playwright
-from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_exponential
+from lxml import etree
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
 
+from .api_profile import ApiEndpoint, infer_endpoint, load_api_profile, save_api_profile
+from .cache import ResponseCache, normalize_url
+from .checkpoint import CheckpointStore
 from .config import CrawlConfig
+from .frontier import Frontier, UrlChannel
 from .models import CourseRecord
-from .parsers import parse_course
-from .rate_limiter import AsyncRateLimiter
+from .parsers import parse_course_bytes, parse_course_content, parser_version
+from .rate_limiter import AdaptiveRateLimiter, AsyncRateLimiter, HostLimiterRegistry, parse_retry_after
+from .sitemap import SitemapEntry, SitemapParser
+from .state import CrawlState
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Page, Route
 
 logger = logging.getLogger(__name__)
 
+_FAILED = object()
+
+# Returns hrefs of course anchors not returned by an earlier call on the same document.
+_NEW_COURSE_HREFS_JS = """
+() => {
+    const seen = (window.__ccSeenAnchors = window.__ccSeenAnchors || new WeakSet());
+    const hrefs = [];
+    for (const a of document.querySelectorAll("a[href*='/course/']")) {
+        if (seen.has(a)) continue;
+        seen.add(a);
+        const href = a.getAttribute("href");
+        if (href) hrefs.push(href);
+    }
+    return hrefs;
+}
+"""
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status == 429 or status >= 500
+    return isinstance(exc, httpx.TransportError)
+
 
 class ClassCentralCrawler:
     def __init__(self, config: CrawlConfig) -> None:
         self.config = config
-        self.rate_limiter = AsyncRateLimiter(config.rate_limit_per_sec)
+        self.rate_limiter = self._build_rate_limiter()
+        self.host_limits = HostLimiterRegistry(
+            urlparse(config.base_url).hostname or "",
+            self.rate_limiter,
+            config.concurrency,
+            default_rate=config.offsite_rate_limit_per_sec,
+            default_concurrency=config.offsite_concurrency,
+            host_rates=config.host_rate_limits,
+        )
         self.seen_urls: set[str] = set()
+        self.lastmod: dict[str, str | None] = {}
+        self.stats: Counter[str] = Counter()
+        self._api_payloads: dict[str, Any] = {}
+        self._useful_endpoints: list[ApiEndpoint] = []
+        self.discovered = UrlChannel()
+        self.checkpoint: CheckpointStore | None = None
+        self._client: httpx.AsyncClient | None = None
+        self.cache: ResponseCache | None = None
+        if config.cache_dir is not None:
+            self.cache = ResponseCache(config.cache_dir, config.cache_ttl_seconds, config.cache_max_bytes)
+        self.state: CrawlState | None = None
+        if config.state_path is not None:
+            self.state = CrawlState(config.state_path)
+        self.parser_version = parser_version(config.jsonld_fast_path)
+        self.parse_workers = config.parse_workers
+        if self.parse_workers is None:
+            self.parse_workers = max((os.cpu_count() or 1) - 1, 1)
+        self._parse_pool: ProcessPoolExecutor | None = None
+
+    def _build_rate_limiter(self) -> AsyncRateLimiter:
+        if not self.config.adaptive_rate:
+            return AsyncRateLimiter(self.config.rate_limit_per_sec, self.config.rate_limit_burst)
+        return AdaptiveRateLimiter(
+            self.config.rate_limit_per_sec,
+            self.config.rate_limit_burst,
+            min_rate=self.config.min_rate_per_sec,
+            max_rate=self.config.max_rate_per_sec,
+            increase_per_sec=self.config.rate_increase_per_sec,
+            decrease_factor=self.config.rate_decrease_factor,
+            latency_target=self.config.latency_target_seconds,
+        )
+
+    def _build_client(self) -> httpx.AsyncClient:
+        # One pooled client for every phase; with HTTP/2 the workers share
+        # multiplexed connections instead of each paying its own handshake.
+        max_connections = self.config.concurrency + self.config.offsite_concurrency
+        limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=self.config.keepalive_seconds,
+        )
+        return httpx.AsyncClient(
+            http2=self.config.http2,
+            limits=limits,
+            timeout=self.config.timeout_seconds,
+            follow_redirects=True,
+        )
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._build_client()
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+        if self.state is not None:
+            self.state.close()
+            self.state = None
+        if self.checkpoint is not None:
+            self.checkpoint.close()
+            self.checkpoint = None
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown(cancel_futures=True)
+            self._parse_pool = None
+
+    async def _fetch(
+        self, url: str, headers: dict[str, str] | None = None, *, use_cache: bool = True, refresh: bool = False
+    ) -> httpx.Response:
+        cache = self.cache if use_cache else None
+        if cache is not None and not refresh:
+            cached = await asyncio.to_thread(cache.get, url)
+            if cached is not None:
+                return cached.to_response()
+        async with self.host_limits.slot(url) as limiter:
+            started = time.monotonic()
+            try:
+                response = await self.client.get(url, headers=headers)
+            except httpx.TransportError:
+                limiter.record(None, time.monotonic() - started)
+                raise
+        limiter.record(
+            response.status_code,
+            time.monotonic() - started,
+            parse_retry_after(response.headers.get("retry-after")),
+        )
+        if response.status_code == 304 and headers:
+            if cache is not None:
+                await asyncio.to_thread(cache.touch, url)
+            return response
+        response.raise_for_status()
+        if cache is not None:
+            await asyncio.to_thread(cache.put, url, response)
+        return response
 
     @retry(
         reraise=True,
         wait=wait_exponential(multiplier=1, min=1, max=8),
         stop=stop_after_attempt(4),
-        retry=retry_if_exception_type(httpx.HTTPError),
+        retry=retry_if_exception(_is_retryable),
     )
-    async def _fetch(self, client: httpx.AsyncClient, url: str) -> httpx.Response:
-        await self.rate_limiter.wait()
-        response = await client.get(url)
-        response.raise_for_status()
-        return response
+    async def _fetch_with_retry(self, url: str, sem: asyncio.Semaphore | None = None) -> httpx.Response:
+        # Only discovery goes through here; listings and API pages must be current.
+        # ``sem`` is held per attempt, so a page backing off doesn't keep its slot.
+        async with sem or contextlib.nullcontext():
+            return await self._fetch(url, use_cache=False)
+
+    @staticmethod
+    def _retry_delay(exc: Exception, attempt: int) -> float | None:
+        if not _is_retryable(exc):
+            return None
+        if isinstance(exc, httpx.HTTPStatusError):
+            retry_after = parse_retry_after(exc.response.headers.get("retry-after"))
+            if retry_after is not None:
+                return retry_after
+        return min(8.0, 2.0**attempt)
 
     @staticmethod
     def _course_links_from_html(html: str, base_url: str) -> set[str]:
@@ -50,8 +208,37 @@ class ClassCentralCrawler:
             urls.add(abs_url)
         return urls
 
+    async def _block_nonessential_requests(self, context: BrowserContext) -> None:
+        blocked_types = set(self.config.blocked_resource_types)
+        allowed_hosts = tuple(h.lower() for h in self.config.allowed_hosts)
+
+        async def handle(route: Route) -> None:
+            request = route.request
+            host = (urlparse(request.url).hostname or "").lower()
+            first_party = any(host == h or host.endswith(f".{h}") for h in allowed_hosts)
+            # XHR/fetch always pass so network API discovery still sees them.
+            if request.resource_type in blocked_types or (
+                not first_party and request.resource_type not in {"xhr", "fetch"}
+            ):
+                self.stats["blocked_requests"] += 1
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await context.route("**/*", handle)
+
     async def _discover_network_api(self, page: Page) -> list[str]:
         found: list[str] = []
+        harvests: list[asyncio.Task[None]] = []
+
+        async def harvest(resp: Any) -> None:
+            # Reuse the body the browser already downloaded instead of re-requesting it later.
+            try:
+                payload = await resp.json()
+            except Exception:
+                return
+            self._api_payloads[normalize_url(resp.url)] = payload
+            self.discovered.publish(self._extract_course_links_from_json(payload))
 
         def on_response(resp: Any) -> None:
             req = resp.request
@@ -61,70 +248,282 @@ class ClassCentralCrawler:
             u = resp.url
             if "classcentral.com" in u and any(x in u.lower() for x in ["search", "course", "catalog", "api"]):
                 found.append(u)
+                harvests.append(asyncio.create_task(harvest(resp)))
 
         page.on("response", on_response)
         await page.goto(self.config.listing_url, wait_until="networkidle")
         await page.mouse.wheel(0, 5000)
         await page.wait_for_timeout(2000)
+        page.remove_listener("response", on_response)
+        await asyncio.gather(*harvests)
         deduped = sorted(set(found))
-        logger.info("Potential API endpoints discovered: %s", deduped[:10])
+        logger.info(
+            "Potential API endpoints discovered: %s (%s JSON bodies harvested)", deduped[:10], len(self._api_payloads)
+        )
         return deduped
 
+    async def _new_course_links(self, page: Page) -> set[str]:
+        hrefs = await page.evaluate(_NEW_COURSE_HREFS_JS)
+        return {urljoin(self.config.base_url, href.split("?")[0]) for href in hrefs}
+
+    async def _scroll_until_stable(self, page: Page) -> set[str]:
+        """Click "Load more" / scroll until the number of course links stops growing.
+
+        After each step we wait until new links appear, or until the page has
+        had no XHR/fetch in flight for ``scroll_quiet_seconds``, bounded by
+        ``scroll_settle_timeout_seconds``. The loop ends once the link count
+        hasn't grown for ``scroll_stable_rounds`` rounds in a row. Links are
+        extracted in the page after every round and only new ones are
+        transferred and published.
+        """
+        links = page.locator("a[href*='/course/']")
+        load_more = page.locator("button:has-text('Load more'), a:has-text('Load more')")
+        in_flight = 0
+        last_activity = time.monotonic()
+
+        def on_request(request: Any) -> None:
+            nonlocal in_flight, last_activity
+            if request.resource_type in {"xhr", "fetch"}:
+                in_flight += 1
+                last_activity = time.monotonic()
+
+        def on_request_done(request: Any) -> None:
+            nonlocal in_flight, last_activity
+            if request.resource_type in {"xhr", "fetch"}:
+                in_flight = max(0, in_flight - 1)
+                last_activity = time.monotonic()
+
+        async def settle(previous: int) -> int:
+            deadline = time.monotonic() + self.config.scroll_settle_timeout_seconds
+            while True:
+                count = await links.count()
+                now = time.monotonic()
+                quiet = in_flight == 0 and now - last_activity >= self.config.scroll_quiet_seconds
+                if count > previous or quiet or now >= deadline:
+                    return count
+                await asyncio.sleep(0.1)
+
+        page.on("request", on_request)
+        page.on("requestfinished", on_request_done)
+        page.on("requestfailed", on_request_done)
+        started = time.monotonic()
+        urls = await self._new_course_links(page)
+        self.discovered.publish(urls)
+        count = await links.count()
+        stable = rounds = 0
+        try:
+            while rounds < self.config.max_scroll_rounds and stable < self.config.scroll_stable_rounds:
+                rounds += 1
+                if await load_more.count() > 0 and await load_more.first.is_visible():
+                    await load_more.first.click()
+                else:
+                    await page.mouse.wheel(0, 7000)
+                last_activity = time.monotonic()
+                count = await settle(count)
+                new_urls = await self._new_course_links(page) - urls
+                stable = 0 if new_urls else stable + 1
+                urls.update(new_urls)
+                self.discovered.publish(new_urls)
+        finally:
+            page.remove_listener("request", on_request)
+            page.remove_listener("requestfinished", on_request_done)
+            page.remove_listener("requestfailed", on_request_done)
+        logger.info(
+            "Listing scroll settled after %s rounds in %.1fs with %s course links",
+            rounds,
+            time.monotonic() - started,
+            len(urls),
+        )
+        return urls
+
     async def _collect_listing_urls_dom(self, page: Page) -> set[str]:
+        from playwright.async_api import Error as PlaywrightError
+
         await page.goto(self.config.listing_url, wait_until="networkidle")
-        # Load-more / infinite scroll
-        for _ in range(30):
-            load_more = page.locator("button:has-text('Load more'), a:has-text('Load more')")
-            if await load_more.count() > 0 and await load_more.first.is_visible():
-                await load_more.first.click()
-                await page.wait_for_timeout(1500)
-                continue
-            await page.mouse.wheel(0, 7000)
-            await page.wait_for_timeout(1200)
-
-        urls = self._course_links_from_html(await page.content(), self.config.base_url)
-
-        # traditional pagination by query ?page=
-        for p in range(2, self.config.max_listing_pages + 1):
-            paged = f"{self.config.listing_url}?page={p}"
-            await page.goto(paged, wait_until="domcontentloaded")
-            html = await page.content()
-            page_urls = self._course_links_from_html(html, self.config.base_url)
-            if not page_urls:
-                break
-            before = len(urls)
-            urls.update(page_urls)
-            if len(urls) == before:
-                stagnant = True
-            else:
-                stagnant = False
-            if stagnant and p > 5:
-                break
-        return urls
+        urls = await self._scroll_until_stable(page)
 
-    async def _collect_listing_urls_api(self, client: httpx.AsyncClient, endpoints: Iterable[str]) -> set[str]:
-        urls: set[str] = set()
-        for ep in endpoints:
-            parsed = urlparse(ep)
-            query = parse_qs(parsed.query)
-            if "page" not in query:
-                query["page"] = ["1"]
-            for page in range(1, self.config.max_listing_pages + 1):
-                query["page"] = [str(page)]
-                qs = "&".join(f"{k}={v[0]}" for k, v in query.items())
-                endpoint = f"{parsed.scheme}://{parsed.netloc}{parsed.path}?{qs}"
+        def page_links_on(tab: Page) -> Callable[[str], Awaitable[set[str] | None]]:
+            async def page_links(url: str) -> set[str] | None:
                 try:
-                    response = await self._fetch(client, endpoint)
-                except Exception:
-                    break
-                try:
-                    payload = response.json()
-                except json.JSONDecodeError:
+                    async with self.host_limits.slot(url):
+                        await tab.goto(url, wait_until="domcontentloaded")
+                    return await self._new_course_links(tab)
+                except PlaywrightError as exc:
+                    logger.warning("Listing page %s failed: %s", url, exc)
+                    return None
+
+            return page_links
+
+        # A pool of tabs in the same context fetches ?page= listings concurrently.
+        extra_tabs = [await page.context.new_page() for _ in range(self.config.listing_page_pool - 1)]
+        try:
+            await self._paginate_listing([page_links_on(tab) for tab in [page, *extra_tabs]], urls)
+        finally:
+            for tab in extra_tabs:
+                await tab.close()
+        return urls
+
+    async def _collect_listing_urls_http(self) -> set[str]:
+        async def page_links(url: str) -> set[str] | None:
+            try:
+                response = await self._fetch_with_retry(url)
+            except httpx.HTTPStatusError as exc:
+                if _is_retryable(exc):
+                    logger.warning("Listing page %s failed: %s", url, exc)
+                    return None
+                return set()
+            except httpx.HTTPError as exc:
+                logger.warning("Listing page %s failed: %s", url, exc)
+                return None
+            return self._course_links_from_html(response.text, self.config.base_url)
+
+        urls = await page_links(self.config.listing_url) or set()
+        self.discovered.publish(urls)
+        await self._paginate_listing([page_links] * self.config.listing_page_pool, urls)
+        return urls
+
+    async def _paginate_listing(
+        self, fetchers: list[Callable[[str], Awaitable[set[str] | None]]], urls: set[str]
+    ) -> None:
+        """Walk ``?page=2..max_listing_pages`` with one worker per fetcher.
+
+        Pages are merged strictly in page order, so the stop rules (an empty
+        page, or a page adding nothing new after page 5) give the same result
+        as a sequential walk; workers stop claiming pages once one fires.
+        A fetcher returns None for a page that kept failing, which is skipped.
+        """
+        next_page = 2
+        next_merge = 2
+        fetched: dict[int, set[str] | None] = {}
+        stopped = False
+
+        def merge() -> None:
+            nonlocal next_merge, stopped
+            while not stopped and next_merge in fetched:
+                p = next_merge
+                page_urls = fetched.pop(p)
+                next_merge += 1
+                if page_urls is None:
+                    continue
+                if not page_urls:
+                    stopped = True
                     break
+                self.discovered.publish(page_urls)
+                before = len(urls)
+                urls.update(page_urls)
+                stagnant = len(urls) == before
+                if stagnant and p > 5:
+                    stopped = True
+
+        async def worker(fetch: Callable[[str], Awaitable[set[str] | None]]) -> None:
+            nonlocal next_page
+            while not stopped and next_page <= self.config.max_listing_pages:
+                p = next_page
+                next_page += 1
+                fetched[p] = await fetch(f"{self.config.listing_url}?page={p}")
+                merge()
+
+        started = time.monotonic()
+        workers = [asyncio.create_task(worker(fetch)) for fetch in fetchers]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            # If one worker fails, stop the rest before the caller closes their tabs.
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        logger.info(
+            "Listing pagination stopped after page %s in %.1fs", next_merge - 1, time.monotonic() - started
+        )
+
+    def _infer_api_endpoints(self, urls: Iterable[str]) -> list[ApiEndpoint]:
+        endpoints: dict[str, ApiEndpoint] = {}
+        for url in urls:
+            payload = self._api_payloads.get(normalize_url(url))
+            endpoint = infer_endpoint(url, payload or {})
+            endpoints.setdefault(endpoint.url, endpoint)
+            if payload is not None and endpoint.page_param not in dict(parse_qsl(urlsplit(url).query)):
+                # Requested without a page parameter, so it was page 1; file it where pagination will look.
+                self._api_payloads.setdefault(normalize_url(endpoint.page_url(1)), payload)
+        return list(endpoints.values())
+
+    async def _fetch_api_page(self, url: str, sem: asyncio.Semaphore) -> Any:
+        """JSON payload of one API page; ``None`` past the end, ``_FAILED`` if it kept failing."""
+        payload = self._api_payloads.get(normalize_url(url))
+        if payload is not None:
+            return payload
+        try:
+            response = await self._fetch_with_retry(url, sem)
+        except httpx.HTTPStatusError as exc:
+            if _is_retryable(exc):
+                logger.warning("API page %s failed: %s", url, exc)
+                return _FAILED
+            return None
+        except httpx.HTTPError as exc:
+            logger.warning("API page %s failed: %s", url, exc)
+            return _FAILED
+        try:
+            return response.json()
+        except json.JSONDecodeError:
+            return None
+
+    async def _collect_listing_urls_api(self, endpoints: Iterable[ApiEndpoint]) -> set[str]:
+        """Paginate every endpoint concurrently under the rate limiter.
+
+        Once the first page reveals the total count, all remaining pages are
+        fetched at once; otherwise pages are prefetched ``api_prefetch_pages``
+        at a time until an empty or stagnant page. A page that keeps failing is
+        skipped rather than ending its endpoint.
+        """
+        urls: set[str] = set()
+        sem = asyncio.Semaphore(self.config.concurrency)
+        max_pages = self.config.max_listing_pages
+
+        async def walk(endpoint: ApiEndpoint) -> None:
+            found: set[str] = set()
+
+            def absorb(payload: Any) -> bool:
                 links = self._extract_course_links_from_json(payload)
-                if not links:
-                    break
+                if not links or links <= found:
+                    return False
+                found.update(links)
                 urls.update(links)
+                self.discovered.publish(links)
+                return True
+
+            first = await self._fetch_api_page(endpoint.page_url(1), sem)
+            if first is None or first is _FAILED:
+                return
+            if (total := endpoint.read_total(first)) is not None:
+                endpoint.total = total
+            if not absorb(first):
+                return
+            if endpoint.offset_based and not endpoint.page_size:
+                last_page = 1
+            elif endpoint.page_count is not None:
+                last_page = min(max_pages, endpoint.page_count)
+            else:
+                last_page = None
+
+            if last_page is not None:
+                payloads = await asyncio.gather(
+                    *(self._fetch_api_page(endpoint.page_url(p), sem) for p in range(2, last_page + 1))
+                )
+                for payload in payloads:
+                    if payload is not None and payload is not _FAILED:
+                        absorb(payload)
+            else:
+                page = 2
+                while page <= max_pages:
+                    window = range(page, min(page + self.config.api_prefetch_pages, max_pages + 1))
+                    payloads = await asyncio.gather(*(self._fetch_api_page(endpoint.page_url(p), sem) for p in window))
+                    if any(payload is None or (payload is not _FAILED and not absorb(payload)) for payload in payloads):
+                        break
+                    page = window.stop
+            if found:
+                self._useful_endpoints.append(endpoint)
+
+        await asyncio.gather(*(walk(endpoint) for endpoint in endpoints))
         return urls
 
     def _extract_course_links_from_json(self, payload: Any) -> set[str]:
@@ -146,42 +545,263 @@ class ClassCentralCrawler:
         return found
 
     async def collect_course_urls(self, context: BrowserContext) -> set[str]:
+        if self.config.block_requests:
+            await self._block_nonessential_requests(context)
         page = await context.new_page()
-        endpoints = await self._discover_network_api(page)
+        endpoints = self._infer_api_endpoints(await self._discover_network_api(page))
         urls = await self._collect_listing_urls_dom(page)
-        async with httpx.AsyncClient(timeout=self.config.timeout_seconds, follow_redirects=True) as client:
-            api_urls = await self._collect_listing_urls_api(client, endpoints)
+        api_urls = await self._collect_listing_urls_api(endpoints)
         urls.update(api_urls)
         await page.close()
+        if self._useful_endpoints:
+            save_api_profile(self.config.api_profile_path, self._useful_endpoints)
+            logger.info("Saved %s API endpoints to %s", len(self._useful_endpoints), self.config.api_profile_path)
         self.seen_urls = urls
         logger.info("Collected %s unique course URLs", len(urls))
         return urls
 
-    async def _scrape_single_course(self, client: httpx.AsyncClient, url: str) -> CourseRecord | None:
+    async def _iter_sitemap(self, url: str) -> AsyncIterator[SitemapEntry]:
+        parser = SitemapParser()
+        async with self.host_limits.slot(url):
+            async with self.client.stream("GET", url) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    for entry in parser.feed(chunk):
+                        yield entry
+        for entry in parser.close():
+            yield entry
+
+    async def iter_sitemap_courses(self) -> AsyncIterator[SitemapEntry]:
+        pending = [self.config.sitemap_url]
+        while pending:
+            sitemap_url = pending.pop(0)
+            children: list[str] = []
+            try:
+                async for entry in self._iter_sitemap(sitemap_url):
+                    if entry.is_sitemap:
+                        children.append(entry.loc)
+                    elif "/course/" in entry.loc:
+                        yield SitemapEntry(urljoin(self.config.base_url, entry.loc.split("?")[0]), entry.lastmod)
+            except (httpx.HTTPError, etree.XMLSyntaxError, zlib.error) as exc:
+                # An HTML soft-404 or a truncated .gz loses that sitemap, not the whole discovery.
+                logger.warning("Sitemap %s failed: %s", sitemap_url, exc)
+                continue
+            # Prefer course-specific child sitemaps when the index names them.
+            course_children = [c for c in children if "course" in c.lower()]
+            pending.extend(course_children or children)
+
+    async def collect_sitemap_urls(self) -> set[str]:
+        urls: set[str] = set()
+        async for entry in self.iter_sitemap_courses():
+            self.lastmod[entry.loc] = entry.lastmod
+            self.discovered.publish([entry.loc])
+            urls.add(entry.loc)
+        self.seen_urls = urls
+        logger.info("Collected %s unique course URLs from sitemaps", len(urls))
+        return urls
+
+    async def _parse(self, url: str, response: httpx.Response) -> CourseRecord:
+        args = (
+            url,
+            response.content,
+            response.encoding or "utf-8",
+            self.config.base_url,
+            self.config.parser_backend,
+            self.config.jsonld_fast_path,
+        )
+        if not self.parse_workers:
+            record, fast = parse_course_content(*args)
+            if fast:
+                self.stats["jsonld_fast_path"] += 1
+            return record
+        if self._parse_pool is None:
+            # Spawned, not forked: the parent already runs cache/state threads.
+            self._parse_pool = ProcessPoolExecutor(self.parse_workers, mp_context=multiprocessing.get_context("spawn"))
+        pool = self._parse_pool
         try:
-            response = await self._fetch(client, url)
-            return parse_course(url, response.text, self.config.base_url)
-        except Exception as exc:
-            logger.warning("Failed %s: %s", url, exc)
-            return None
+            data, fast = await asyncio.get_running_loop().run_in_executor(pool, parse_course_bytes, *args)
+        except BrokenProcessPool:
+            # A worker died mid-parse; the next page gets a fresh pool.
+            if self._parse_pool is pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+                self._parse_pool = None
+            raise
+        if fast:
+            self.stats["jsonld_fast_path"] += 1
+        return CourseRecord.from_bytes(data)
+
+    async def _scrape_single_course(self, url: str) -> CourseRecord:
+        previous = await asyncio.to_thread(self.state.get, url) if self.state is not None else None
+        lastmod = self.lastmod.get(url)
+        # A record stored by other parsing code is only good for its validators.
+        current = previous is not None and previous.parser_version == self.parser_version
+        if self.config.incremental and current and previous.unchanged_since(lastmod):
+            self.stats["unchanged"] += 1
+            return previous.record
+        # A lastmod we can't match to the stored record means any cached copy may predate the change.
+        moved = lastmod is not None and (previous is None or not previous.unchanged_since(lastmod))
+        response = await self._fetch(url, previous.conditional_headers() if previous else None, refresh=moved)
+        if response.status_code == 304 and current:
+            await asyncio.to_thread(self.state.touch, url, lastmod)
+            self.stats["not_modified"] += 1
+            return previous.record
+        if response.status_code == 304:
+            # The body is unchanged, so re-parse our copy of it; without one, fetch it whole.
+            cached = await asyncio.to_thread(self.cache.get, url, allow_stale=True) if self.cache is not None else None
+            response = cached.to_response() if cached is not None else await self._fetch(url, refresh=True)
+        record = await self._parse(url, response)
+        self.stats["parsed"] += 1
+        if self.state is not None:
+            await asyncio.to_thread(
+                self.state.put,
+                record,
+                response.headers.get("etag"),
+                response.headers.get("last-modified"),
+                lastmod,
+                self.parser_version,
+            )
+        return record
+
+    async def stream_courses(self, urls: Iterable[str] | AsyncIterable[str]) -> AsyncIterator[CourseRecord]:
+        # Bounded queues on both sides keep memory flat however many URLs come in.
+        frontier = Frontier(self.config.concurrency * 4)
+        results: asyncio.Queue[CourseRecord | None] = asyncio.Queue(self.config.concurrency * 4)
+
+        async def produce() -> None:
+            try:
+                if isinstance(urls, AsyncIterable):
+                    async for url in urls:
+                        await frontier.put(url)
+                else:
+                    for url in urls:
+                        await frontier.put(url)
+            finally:
+                frontier.close()
+
+        async def worker() -> None:
+            while (job := await frontier.get()) is not None:
+                url, attempt = job
+                try:
+                    record = await self._scrape_single_course(url)
+                except Exception as exc:
+                    delay = self._retry_delay(exc, attempt)
+                    if delay is not None and attempt + 1 < self.config.max_retries:
+                        logger.debug("Retrying %s in %.1fs: %s", url, delay, exc)
+                        frontier.retry(url, attempt + 1, delay)
+                    else:
+                        # Left pending in the checkpoint so --resume tries it again.
+                        logger.warning("Failed %s: %s", url, exc)
+                        self.stats["failed"] += 1
+                    continue
+                finally:
+                    frontier.done()
+                self._completed(url, record)
+                await results.put(record)
+
+        async def drive() -> None:
+            try:
+                await asyncio.gather(produce(), *(worker() for _ in range(self.config.concurrency)))
+            finally:
+                await results.put(None)
+
+        task = asyncio.create_task(drive())
+        try:
+            while (record := await results.get()) is not None:
+                yield record
+            await task
+        finally:
+            if not task.done():
+                task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await task
+
+    def _completed(self, url: str, record: CourseRecord) -> None:
+        if self.checkpoint is not None:
+            self.checkpoint.complete(url, record)
 
     async def scrape_courses(self, urls: Iterable[str]) -> list[CourseRecord]:
-        sem = asyncio.Semaphore(self.config.concurrency)
+        return [record async for record in self.stream_courses(urls)]
+
+    async def _discover(self) -> None:
+        try:
+            mode = self.config.discovery
+            profile: list[ApiEndpoint] = []
+            if mode == "api":
+                profile = load_api_profile(self.config.api_profile_path)
+                if not profile:
+                    logger.warning("No API profile at %s, discovering with the browser", self.config.api_profile_path)
+                    mode = "browser"
+            if mode == "sitemap":
+                await self.collect_sitemap_urls()
+            elif mode == "api":
+                urls = await self._collect_listing_urls_api(profile)
+                self.seen_urls = urls
+                logger.info("Collected %s unique course URLs from %s saved API endpoints", len(urls), len(profile))
+            elif mode == "http":
+                urls = await self._collect_listing_urls_http()
+                self.seen_urls = urls
+                logger.info("Collected %s unique course URLs over HTTP", len(urls))
+            else:
+                # Imported lazily so sitemap/HTTP deployments don't need Playwright at all.
+                from playwright.async_api import async_playwright
+
+                async with async_playwright() as p:
+                    browser = await p.chromium.launch(headless=self.config.headless)
+                    context = await browser.new_context()
+                    await self.collect_course_urls(context)
+                    await context.close()
+                    await browser.close()
+            if self.checkpoint is not None:
+                await asyncio.to_thread(self.checkpoint.mark_discovery_complete)
+        finally:
+            self.discovered.close()
 
-        async with httpx.AsyncClient(timeout=self.config.timeout_seconds, follow_redirects=True) as client:
-            async def run(url: str) -> CourseRecord | None:
-                async with sem:
-                    return await self._scrape_single_course(client, url)
+    def _open_checkpoint(self) -> CheckpointStore:
+        checkpoint = CheckpointStore(self.config.checkpoint_path)
+        if not self.config.resume:
+            checkpoint.reset()
+        return checkpoint
 
-            results = await asyncio.gather(*(run(url) for url in urls))
-        return [r for r in results if r]
+    async def _flush_checkpoint_periodically(self, checkpoint: CheckpointStore) -> None:
+        # Off the event loop, like the cache and state writes, so a large flush doesn't stall requests.
+        while True:
+            await asyncio.sleep(self.config.checkpoint_interval_seconds)
+            await asyncio.to_thread(checkpoint.flush)
+
+    async def crawl(self) -> AsyncIterator[CourseRecord]:
+        self.checkpoint = checkpoint = self._open_checkpoint()
+        self.discovered = UrlChannel(on_new=checkpoint.add_discovered)
+        discovery: asyncio.Task[None] | None = None
+        flusher: asyncio.Task[None] | None = None
+        try:
+            if self.config.resume:
+                # Completed URLs are never queued again; their records come from the checkpoint.
+                self.discovered.seen.update(checkpoint.completed_urls())
+                self.discovered.publish(checkpoint.pending_urls())
+                resumed = 0
+                for record in checkpoint.records():
+                    resumed += 1
+                    yield record
+                logger.info("Resumed %s records, %s URLs pending", resumed, len(self.discovered.seen) - resumed)
+            if checkpoint.discovery_complete:
+                self.discovered.close()
+            else:
+                # Detail pages are scraped as soon as discovery publishes them, so the
+                # two phases overlap instead of running back to back.
+                discovery = asyncio.create_task(self._discover())
+            flusher = asyncio.create_task(self._flush_checkpoint_periodically(checkpoint))
+            async for record in self.stream_courses(self.discovered):
+                yield record
+            if discovery is not None:
+                await discovery
+            logger.info("Crawl finished: %s", ", ".join(f"{k}={v}" for k, v in sorted(self.stats.items())))
+        finally:
+            for task in (discovery, flusher):
+                if task is not None and not task.done():
+                    task.cancel()
+                    with contextlib.suppress(asyncio.CancelledError):
+                        await task
+            await self.aclose()
 
     async def run(self) -> list[CourseRecord]:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=self.config.headless)
-            context = await browser.new_context()
-            urls = await self.collect_course_urls(context)
-            records = await self.scrape_courses(sorted(urls))
-            await context.close()
-            await browser.close()
-        return records
+        return [record async for record in self.crawl()]
@@ -22,3 +22,37 @@ def export_csv(records: list[CourseRecord], path: Path) -> None:
         writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
         writer.writeheader()
         writer.writerows(rows)
+
+
+class StreamingExporter:
+    """Writes records to JSON and CSV as they arrive instead of holding them all in memory.
+
+    The output matches ``export_json`` / ``export_csv`` for the same records.
+    """
+
+    def __init__(self, json_path: Path, csv_path: Path) -> None:
+        self.count = 0
+        self._json = json_path.open("wb")
+        self._csv_file = csv_path.open("w", newline="", encoding="utf-8")
+        self._csv: csv.DictWriter | None = None
+
+    def write(self, record: CourseRecord) -> None:
+        row = record.to_dict()
+        item = orjson.dumps(row, option=orjson.OPT_INDENT_2).replace(b"\n", b"\n  ")
+        self._json.write((b"[\n  " if self.count == 0 else b",\n  ") + item)
+        if self._csv is None:
+            self._csv = csv.DictWriter(self._csv_file, fieldnames=list(row.keys()))
+            self._csv.writeheader()
+        self._csv.writerow(row)
+        self.count += 1
+
+    def close(self) -> None:
+        self._json.write(b"\n]" if self.count else b"[]")
+        self._json.close()
+        self._csv_file.close()
+
+    def __enter__(self) -> StreamingExporter:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
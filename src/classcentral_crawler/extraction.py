@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import json
+import re
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from .jsonld import find_course
+from .parser_backends import XPATHS, CourseDocument
+
+JSONLD_SELECTOR = "script[type='application/ld+json']"
+
+# (value, base_url) -> field value
+PostProcess = Callable[[Any, str], Any]
+
+
+@dataclass(frozen=True, slots=True)
+class Css:
+    """Text of the first element matching ``selector`` (or of all of them), or one of its attributes."""
+
+    selector: str
+    attr: str | None = None
+    all: bool = False
+    post: PostProcess | None = None
+    accept: Callable[[Any], bool] | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class JsonLd:
+    """Value at a dotted path in the page's course JSON-LD; the first truthy one of several paths."""
+
+    paths: tuple[str, ...] = ("",)
+    post: PostProcess | None = None
+    accept: Callable[[Any], bool] | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class Fact:
+    """Text around the first string in the page mentioning ``label``, with the label removed."""
+
+    label: str
+    post: PostProcess | None = None
+    accept: Callable[[Any], bool] | None = None
+
+
+Source = Css | JsonLd | Fact
+
+
+@dataclass(frozen=True, slots=True)
+class Field:
+    """A record field and the sources tried for it, in order.
+
+    The first source yielding a truthy, accepted value wins and its ``post``
+    is applied, even if that turns it into None. If no source hits, the field
+    is ``default()``, or with ``keep_empty`` the last non-None value seen
+    (so an empty string stays an empty string, as with ``a or b``).
+    """
+
+    name: str
+    sources: tuple[Source, ...]
+    default: Callable[[], Any] | None = None
+    keep_empty: bool = False
+
+
+def extract_jsonld(doc: CourseDocument) -> dict[str, Any] | None:
+    for node in doc.select(JSONLD_SELECTOR):
+        raw = doc.script_text(node)
+        if not raw:
+            continue
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError:
+            continue
+        if (item := find_course(data)) is not None:
+            return item
+    return None
+
+
+def extract_facts(doc: CourseDocument, patterns: dict[str, re.Pattern[str]]) -> dict[str, str | None]:
+    """Value next to each label, from one walk over the document's strings.
+
+    A label's value comes from the parent of the first string mentioning it,
+    with the label itself removed.
+    """
+    facts: dict[str, str | None] = dict.fromkeys(patterns)
+    pending = dict(patterns)
+    any_label = re.compile("|".join(p.pattern for p in patterns.values()), re.I)
+    for string, owner in doc.strings():
+        if not any_label.search(string):
+            continue
+        text = None
+        for label, pattern in list(pending.items()):
+            if not pattern.search(string):
+                continue
+            del pending[label]
+            if text is None:
+                text = doc.node_text(owner)
+            value = pattern.sub("", text).strip(" :-")
+            if value and len(value) < 200:
+                facts[label] = value
+        if not pending:
+            break
+    return facts
+
+
+class _Run:
+    """Per-document memo: every selector is queried, and the JSON-LD and facts extracted, at most once."""
+
+    __slots__ = ("doc", "plan", "nodes", "jsonld", "facts")
+
+    def __init__(self, plan: ExtractionPlan, doc: CourseDocument) -> None:
+        self.doc = doc
+        self.plan = plan
+        self.nodes: list[Any] = [_UNSET] * len(plan.selectors)
+        self.jsonld: Any = _UNSET
+        self.facts: dict[str, str | None] | None = None
+
+    def node(self, slot: int, all: bool) -> Any:
+        if self.nodes[slot] is _UNSET:
+            selector = self.plan.selectors[slot]
+            self.nodes[slot] = self.doc.select(selector) if all else self.doc.select_one(selector)
+        return self.nodes[slot]
+
+    def course(self) -> Any:
+        if self.jsonld is _UNSET:
+            self.jsonld = extract_jsonld(self.doc)
+        return self.jsonld
+
+    def fact(self, label: str) -> str | None:
+        if self.facts is None:
+            # One walk fills every label the plan uses.
+            self.facts = extract_facts(self.doc, self.plan.fact_patterns)
+        return self.facts[label]
+
+
+_UNSET = object()
+
+
+def _compile_source(source: Source, slots: dict[tuple[str, bool], int]) -> Callable[[_Run], Any]:
+    if isinstance(source, Css):
+        slot = slots.setdefault((source.selector, source.all), len(slots))
+        name = source.attr
+        if source.all:
+            return lambda run: [t for n in run.node(slot, True) if (t := run.doc.node_text(n))]
+        if name is None:
+            return lambda run: (n := run.node(slot, False)) is not None and run.doc.node_text(n) or None
+        return lambda run: run.doc.node_attr(n, name) if (n := run.node(slot, False)) is not None else None
+    if isinstance(source, JsonLd):
+        paths = [tuple(p.split(".")) if p else () for p in source.paths]
+
+        def read(run: _Run) -> Any:
+            course = run.course()
+            if course is None:
+                return None
+            value = None
+            for path in paths:
+                value = course
+                for key in path:
+                    value = value.get(key) if isinstance(value, dict) else None
+                if value:
+                    break
+            return value
+
+        return read
+    label = source.label
+    return lambda run: run.fact(label)
+
+
+@dataclass(frozen=True, slots=True)
+class _CompiledField:
+    name: str
+    sources: tuple[tuple[Callable[[_Run], Any], PostProcess | None, Callable[[Any], bool] | None], ...]
+    default: Callable[[], Any] | None
+    keep_empty: bool
+
+
+class ExtractionPlan:
+    """A field spec compiled once: selectors deduplicated into shared slots, facts gathered in one pass."""
+
+    def __init__(self, fields: Iterable[Field]) -> None:
+        slots: dict[tuple[str, bool], int] = {}
+        self.fact_patterns: dict[str, re.Pattern[str]] = {}
+        compiled = []
+        for field in fields:
+            sources = []
+            for source in field.sources:
+                if isinstance(source, Fact):
+                    self.fact_patterns.setdefault(source.label, re.compile(source.label, re.I))
+                sources.append((_compile_source(source, slots), source.post, source.accept))
+            compiled.append(_CompiledField(field.name, tuple(sources), field.default, field.keep_empty))
+        self.fields = tuple(compiled)
+        self.selectors = tuple(selector for selector, _ in slots)
+        # The lxml backend only knows hand-translated selectors; fail here rather than on every page.
+        missing = [s for s in (*self.selectors, JSONLD_SELECTOR) if s not in XPATHS]
+        if missing:
+            raise ValueError(f"No XPath for selectors {missing}; add them to parser_backends.XPATHS")
+
+    def run(self, doc: CourseDocument, base_url: str) -> dict[str, Any]:
+        run = _Run(self, doc)
+        values: dict[str, Any] = {}
+        for field in self.fields:
+            result = field.default() if field.default else None
+            seen = None
+            for read, post, accept in field.sources:
+                value = read(run)
+                if accept is not None and not accept(value):
+                    continue
+                if value:
+                    result = post(value, base_url) if post else value
+                    break
+                if value is not None:
+                    seen = value
+            else:
+                if field.keep_empty and seen is not None:
+                    result = seen
+            values[field.name] = result
+        return values
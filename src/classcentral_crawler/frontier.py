@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections.abc import AsyncIterator, Callable, Iterable
+
+
+class RetryQueue:
+    """URLs waiting to be retried, ordered by the time they become due."""
+
+    def __init__(self) -> None:
+        self._heap: list[tuple[float, int, str, int]] = []
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def push(self, url: str, attempt: int, delay: float) -> None:
+        heapq.heappush(self._heap, (time.monotonic() + delay, next(self._counter), url, attempt))
+
+    def pop_ready(self) -> tuple[str, int] | None:
+        if not self._heap or self._heap[0][0] > time.monotonic():
+            return None
+        _, _, url, attempt = heapq.heappop(self._heap)
+        return url, attempt
+
+    def next_delay(self) -> float | None:
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - time.monotonic())
+
+
+class Frontier:
+    """Bounded queue of URLs for the scrape workers, plus their delayed retries.
+
+    ``get`` hands out due retries first, then new URLs, and returns ``None``
+    once the frontier is closed and nothing is queued, retrying or in flight.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize)
+        self._retries = RetryQueue()
+        self._changed = asyncio.Event()
+        self._closed = False
+        self._in_flight = 0
+
+    async def put(self, url: str) -> None:
+        await self._queue.put(url)
+        self._changed.set()
+
+    def close(self) -> None:
+        self._closed = True
+        self._changed.set()
+
+    def retry(self, url: str, attempt: int, delay: float) -> None:
+        self._retries.push(url, attempt, delay)
+        self._changed.set()
+
+    def done(self) -> None:
+        self._in_flight -= 1
+        self._changed.set()
+
+    async def get(self) -> tuple[str, int] | None:
+        while True:
+            job = self._retries.pop_ready()
+            if job is None and not self._queue.empty():
+                job = (self._queue.get_nowait(), 0)
+            if job is not None:
+                self._in_flight += 1
+                return job
+            if self._closed and self._in_flight == 0 and not self._retries:
+                self._changed.set()
+                return None
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), self._retries.next_delay())
+            except TimeoutError:
+                pass
+
+
+class UrlChannel:
+    """Deduplicating channel from URL discovery to the scrape frontier.
+
+    Collectors ``publish`` as they find links; the scraper iterates the channel
+    concurrently and stops once discovery calls ``close``.
+    """
+
+    def __init__(self, on_new: Callable[[list[str]], None] | None = None) -> None:
+        self.seen: set[str] = set()
+        self._queue: asyncio.Queue[str | None] = asyncio.Queue()
+        self._on_new = on_new
+
+    def publish(self, urls: Iterable[str]) -> int:
+        new = [url for url in dict.fromkeys(urls) if url not in self.seen]
+        self.seen.update(new)
+        for url in new:
+            self._queue.put_nowait(url)
+        if new and self._on_new is not None:
+            self._on_new(new)
+        return len(new)
+
+    def close(self) -> None:
+        self._queue.put_nowait(None)
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        while (url := await self._queue.get()) is not None:
+            yield url
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import codecs
+import re
+from collections.abc import Iterator
+from typing import Any
+from urllib.parse import urljoin
+
+import orjson
+
+from .models import CourseRecord
+
+COURSE_TYPES = {"Course", "EducationalOccupationalProgram", "Product"}
+
+# Fields a page's JSON-LD must supply for the DOM parse to be skipped.
+REQUIRED_FIELDS = ("title", "description", "provider_platform", "rating", "price")
+
+_SCRIPT = re.compile(
+    rb"""<script\b[^>]*?\btype\s*=\s*["']?application/ld\+json["']?[^>]*>(.*?)</script\s*>""",
+    re.I | re.S,
+)
+_UTF8_COMPATIBLE = {"utf-8", "ascii"}
+
+
+def find_course(data: Any) -> dict[str, Any] | None:
+    candidates = data if isinstance(data, list) else [data]
+    for item in candidates:
+        if isinstance(item, dict) and item.get("@type") in COURSE_TYPES:
+            return item
+    return None
+
+
+def scan_course_jsonld(content: bytes, encoding: str = "utf-8") -> dict[str, Any] | None:
+    """First course-like JSON-LD item in a raw HTML body, found without building a DOM."""
+    utf8 = codecs.lookup(encoding).name in _UTF8_COMPATIBLE
+    for match in _SCRIPT.finditer(content):
+        raw = match.group(1).strip()
+        if not raw:
+            continue
+        try:
+            data = orjson.loads(raw if utf8 else raw.decode(encoding, errors="replace"))
+        except orjson.JSONDecodeError:
+            continue
+        if (item := find_course(data)) is not None:
+            return item
+    return None
+
+
+def _first_dict(value: Any) -> dict[str, Any] | None:
+    if isinstance(value, list):
+        value = next((v for v in value if isinstance(v, dict)), None)
+    return value if isinstance(value, dict) else None
+
+
+def _text(value: Any) -> str | None:
+    if isinstance(value, list):
+        value = next(iter(value), None)
+    if isinstance(value, dict):
+        value = value.get("name")
+    if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+        return str(value).strip() or None
+    return None
+
+
+def _number(value: Any, kind: type) -> Any:
+    try:
+        return kind(float(str(value).replace(",", ""))) if value not in (None, "") else None
+    except (ValueError, OverflowError):
+        return None
+
+
+def _names(value: Any) -> Iterator[str]:
+    for item in value if isinstance(value, list) else [value]:
+        if name := _text(item):
+            yield name
+
+
+def record_from_jsonld(url: str, base_url: str, item: dict[str, Any]) -> CourseRecord:
+    """Every CourseRecord field the JSON-LD item can supply; the rest are left empty."""
+    rating = _first_dict(item.get("aggregateRating")) or {}
+    offers = _first_dict(item.get("offers")) or {}
+    price = None
+    if offers.get("price") is not None:
+        price = f"{offers.get('priceCurrency') or ''} {offers['price']}".strip()
+    image = item.get("image")
+    if isinstance(image, dict):
+        image = image.get("url")
+    enrollment = offers.get("url")
+    return CourseRecord(
+        url=url,
+        title=_text(item.get("name")),
+        provider_platform=_text(item.get("provider")),
+        university=_text(item.get("sourceOrganization")),
+        instructors=list(_names(item.get("instructor") or item.get("creator"))),
+        description=_text(item.get("description")),
+        rating=_number(rating.get("ratingValue"), float),
+        review_count=_number(rating.get("reviewCount") or rating.get("ratingCount"), int),
+        language=_text(item.get("inLanguage")),
+        level=_text(item.get("educationalLevel")),
+        duration=_text(item.get("timeRequired")),
+        price=price,
+        certificate_availability=_text(item.get("educationalCredentialAwarded")),
+        enrollment_link=urljoin(base_url, enrollment) if isinstance(enrollment, str) and enrollment else None,
+        image_url=image if isinstance(image, str) and image else None,
+        raw_jsonld=item,
+    )
@@ -6,20 +6,104 @@ from pathlib import Path
 
 from .config import CrawlConfig
 from .crawler import ClassCentralCrawler
-from .exporters import export_csv, export_json
+from .exporters import StreamingExporter
 from .logger import configure_logging
+from .parser_backends import BACKENDS
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Crawl Class Central courses")
     parser.add_argument("--output-dir", default="output")
     parser.add_argument("--max-pages", type=int, default=200)
+    parser.add_argument("--page-pool", type=int, default=4, help="Listing pages fetched concurrently")
+    parser.add_argument(
+        "--discovery",
+        choices=["browser", "http", "sitemap", "api"],
+        default="browser",
+        help=(
+            "Find course URLs by crawling listings in Chromium, over plain HTTP, from the sitemaps, "
+            "or from the API endpoints saved by an earlier browser run"
+        ),
+    )
+    parser.add_argument("--api-profile", default=".cache/api_profile.json", help="Saved API endpoints")
+    parser.add_argument(
+        "--no-browser",
+        action="store_const",
+        const="http",
+        dest="discovery",
+        help="Shorthand for --discovery http",
+    )
     parser.add_argument("--concurrency", type=int, default=5)
     parser.add_argument("--rate", type=float, default=1.5, help="Requests per second")
+    parser.add_argument("--burst", type=int, default=1, help="Requests allowed back to back before --rate applies")
+    parser.add_argument("--adaptive-rate", action="store_true", help="Tune the rate with AIMD starting from --rate")
+    parser.add_argument("--min-rate", type=float, default=0.2, help="Adaptive mode lower bound (req/sec)")
+    parser.add_argument("--max-rate", type=float, default=10.0, help="Adaptive mode upper bound (req/sec)")
+    parser.add_argument("--resume", action="store_true", help="Continue the crawl checkpointed in --output-dir")
+    parser.add_argument("--checkpoint-interval", type=float, default=30.0, help="Seconds between checkpoint flushes")
+    parser.add_argument("--offsite-rate", type=float, default=2.0, help="Per-host rate for non-classcentral hosts")
+    parser.add_argument("--offsite-concurrency", type=int, default=2, help="Per-host concurrency for non-classcentral hosts")
+    parser.add_argument(
+        "--host-rate",
+        action="append",
+        default=[],
+        metavar="HOST=RATE",
+        help="Override the rate for one off-site host (repeatable)",
+    )
     parser.add_argument("--headed", action="store_true", help="Run browser with UI")
+    parser.add_argument(
+        "--no-block",
+        action="store_true",
+        help="Let the browser load images, fonts, media and third-party resources",
+    )
+    parser.add_argument(
+        "--allow-host",
+        action="append",
+        default=[],
+        metavar="HOST",
+        help="Extra host (and its subdomains) the browser may load anything from (repeatable)",
+    )
+    parser.add_argument("--cache-dir", default=".cache/http", help="On-disk HTTP response cache")
+    parser.add_argument("--cache-ttl", type=float, default=7 * 24, help="Cache entry lifetime in hours")
+    parser.add_argument("--cache-max-mb", type=int, default=2048, help="Cache size cap before LRU eviction")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the HTTP response cache")
+    parser.add_argument("--state-db", default=".cache/state.sqlite3", help="Per-URL records and validators from past runs")
+    parser.add_argument("--no-state", action="store_true", help="Disable conditional revalidation against past runs")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip courses whose sitemap lastmod hasn't moved since they were last crawled",
+    )
+    parser.add_argument(
+        "--parser",
+        choices=sorted(BACKENDS),
+        default="bs4",
+        help="HTML parser for course pages; lxml is faster and yields identical records",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Processes parsing course pages off the event loop (default: CPU cores - 1; 0 parses inline)",
+    )
+    parser.add_argument(
+        "--jsonld-fast-path",
+        action="store_true",
+        help="Take course fields from JSON-LD and skip HTML parsing when it has all the key fields",
+    )
     return parser.parse_args()
 
 
+def _parse_host_rates(values: list[str]) -> dict[str, float]:
+    rates: dict[str, float] = {}
+    for value in values:
+        host, sep, rate = value.partition("=")
+        if not sep:
+            raise SystemExit(f"--host-rate expects HOST=RATE, got {value!r}")
+        rates[host.strip()] = float(rate)
+    return rates
+
+
 async def _run() -> None:
     args = parse_args()
     configure_logging()
@@ -27,19 +111,40 @@ async def _run() -> None:
     config = CrawlConfig(
         output_dir=Path(args.output_dir),
         max_listing_pages=args.max_pages,
+        listing_page_pool=args.page_pool,
+        discovery=args.discovery,
+        api_profile_path=Path(args.api_profile),
         concurrency=args.concurrency,
         rate_limit_per_sec=args.rate,
+        rate_limit_burst=args.burst,
+        adaptive_rate=args.adaptive_rate,
+        min_rate_per_sec=args.min_rate,
+        max_rate_per_sec=args.max_rate,
+        offsite_rate_limit_per_sec=args.offsite_rate,
+        offsite_concurrency=args.offsite_concurrency,
+        host_rate_limits=_parse_host_rates(args.host_rate),
+        checkpoint_interval_seconds=args.checkpoint_interval,
+        resume=args.resume,
         headless=not args.headed,
+        block_requests=not args.no_block,
+        allowed_hosts=("classcentral.com", *args.allow_host),
+        cache_dir=None if args.no_cache else Path(args.cache_dir),
+        cache_ttl_seconds=args.cache_ttl * 3600,
+        cache_max_bytes=args.cache_max_mb * 1024 * 1024,
+        state_path=None if args.no_state else Path(args.state_db),
+        incremental=args.incremental,
+        parser_backend=args.parser,
+        parse_workers=args.parse_workers,
+        jsonld_fast_path=args.jsonld_fast_path,
     )
 
     config.output_dir.mkdir(parents=True, exist_ok=True)
     crawler = ClassCentralCrawler(config)
-    records = await crawler.run()
-
-    export_json(records, config.output_dir / "courses.json")
-    export_csv(records, config.output_dir / "courses.csv")
+    with StreamingExporter(config.output_dir / "courses.json", config.output_dir / "courses.csv") as exporter:
+        async for record in crawler.crawl():
+            exporter.write(record)
 
-    print(f"Scraped {len(records)} courses")
+    print(f"Scraped {exporter.count} courses")
     print(f"JSON: {config.output_dir / 'courses.json'}")
     print(f"CSV:  {config.output_dir / 'courses.csv'}")
 
@@ -3,6 +3,8 @@ from __future__ import annotations
 from dataclasses import asdict, dataclass, field
 from typing import Any
 
+import orjson
+
 
 @dataclass(slots=True)
 class CourseRecord:
@@ -27,3 +29,10 @@ class CourseRecord:
         data = asdict(self)
         data["instructors"] = "; ".join(self.instructors)
         return data
+
+    def to_bytes(self) -> bytes:
+        return orjson.dumps(asdict(self))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> CourseRecord:
+        return cls(**orjson.loads(data))
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from typing import Any, Protocol
+
+from bs4 import BeautifulSoup, NavigableString
+from lxml import etree
+
+# CSS selectors used by the course field spec (parsers.COURSE_FIELDS) and their XPath
+# equivalents for the lxml backend; a selector added to the spec needs an entry here.
+# Class selectors match whitespace-separated tokens, and like soupsieve the
+# value of ``type`` is compared case-insensitively.
+_UPPER = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+_LOWER = "abcdefghijklmnopqrstuvwxyz"
+
+
+def _cls(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+XPATHS: dict[str, str] = {
+    "h1": "//h1",
+    "script[type='application/ld+json']": f"//script[translate(@type, '{_UPPER}', '{_LOWER}')='application/ld+json']",
+    "meta[name='description']": "//meta[@name='description']",
+    "meta[property='og:image']": "//meta[@property='og:image']",
+    "[data-name='instructors'] a, .instructor a, .course-instructors a": (
+        f"//*[@data-name='instructors']//a | //*[{_cls('instructor')}]//a | //*[{_cls('course-instructors')}]//a"
+    ),
+    "[data-name='provider'] a, .course-provider a, a[data-track*='provider']": (
+        f"//*[@data-name='provider']//a | //*[{_cls('course-provider')}]//a | //a[contains(@data-track, 'provider')]"
+    ),
+    "[data-name='institution'] a, .course-institution a": (
+        f"//*[@data-name='institution']//a | //*[{_cls('course-institution')}]//a"
+    ),
+    "[itemprop='ratingValue'], .rating .value": f"//*[@itemprop='ratingValue'] | //*[{_cls('rating')}]//*[{_cls('value')}]",
+    "[itemprop='reviewCount'], .rating .count": f"//*[@itemprop='reviewCount'] | //*[{_cls('rating')}]//*[{_cls('count')}]",
+    "a[data-name='go-to-class']": "//a[@data-name='go-to-class']",
+    "a.btn-go-to-class": f"//a[{_cls('btn-go-to-class')}]",
+    "a[href*='classcentral.com/redirect']": "//a[contains(@href, 'classcentral.com/redirect')]",
+}
+
+_COMPILED = {css: etree.XPath(xpath) for css, xpath in XPATHS.items()}
+
+
+class CourseDocument(Protocol):
+    """What parse_course needs from a parsed HTML page, whatever the parser."""
+
+    def select_one(self, selector: str) -> Any | None:
+        """First element matching ``selector``, or None."""
+
+    def select(self, selector: str) -> list[Any]:
+        """Every element matching ``selector``, in document order."""
+
+    def node_text(self, node: Any) -> str:
+        """Stripped, space-joined text of an element."""
+
+    def node_attr(self, node: Any, name: str) -> str | None:
+        """Attribute ``name`` of an element."""
+
+    def script_text(self, node: Any) -> str:
+        """Raw contents of a script element."""
+
+    def strings(self) -> Iterator[tuple[str, Any]]:
+        """Every string in the document (comments and script bodies included) with its parent element, in order."""
+
+
+class SoupDocument:
+    def __init__(self, html: str) -> None:
+        self.soup = BeautifulSoup(html, "lxml")
+
+    def select_one(self, selector: str) -> Any | None:
+        return self.soup.select_one(selector)
+
+    def select(self, selector: str) -> list[Any]:
+        return self.soup.select(selector)
+
+    def node_text(self, node: Any) -> str:
+        return node.get_text(" ", strip=True)
+
+    def node_attr(self, node: Any, name: str) -> str | None:
+        return node.get(name)
+
+    def script_text(self, node: Any) -> str:
+        return node.string or node.get_text(strip=True)
+
+    def strings(self) -> Iterator[tuple[str, Any]]:
+        for node in self.soup.descendants:
+            if isinstance(node, NavigableString):
+                yield node, node.parent
+
+
+# Tags whose strings BeautifulSoup types as Script/Stylesheet/TemplateString/...;
+# get_text() on any other tag skips them.
+_STRING_CONTAINERS = {"script", "style", "template", "rt", "rp"}
+
+
+def _iter_strings(root: etree._Element) -> Iterator[tuple[str, etree._Element, str | None, bool]]:
+    """Strings under ``root`` in document order as ``(text, parent, container, is_comment)``.
+
+    ``container`` is the innermost enclosing string-container tag, mirroring
+    how BeautifulSoup decides a string's type.
+    """
+    parent = root.getparent()
+    outer = None
+    while parent is not None:
+        if parent.tag in _STRING_CONTAINERS:
+            outer = parent.tag
+            break
+        parent = parent.getparent()
+    stack: list[tuple[etree._Element, str | None, bool]] = [(root, outer, True)]
+    while stack:
+        node, container, entering = stack.pop()
+        if not entering:
+            if node is not root and node.tail:
+                yield node.tail, node.getparent(), container, False
+            continue
+        stack.append((node, container, False))
+        if not isinstance(node.tag, str):
+            # Comments and processing instructions: never part of get_text().
+            if node.text:
+                yield node.text, node.getparent(), container, True
+            continue
+        inner = node.tag if node.tag in _STRING_CONTAINERS else container
+        if node.text:
+            yield node.text, node, inner, False
+        for child in reversed(node):
+            stack.append((child, inner, True))
+
+
+def _get_text(node: etree._Element) -> str:
+    wanted = node.tag if node.tag in _STRING_CONTAINERS else None
+    parts = []
+    for text, _, container, is_comment in _iter_strings(node):
+        if is_comment or container != wanted:
+            continue
+        text = text.strip()
+        if text:
+            parts.append(text)
+    return " ".join(parts)
+
+
+class LxmlDocument:
+    """Direct lxml tree with precompiled XPath; produces the same values as SoupDocument."""
+
+    def __init__(self, html: str) -> None:
+        # Feed it like BeautifulSoup's lxml builder does, so markup that the
+        # push parser gives up on yields the same (empty) document.
+        parser = etree.HTMLParser(strip_cdata=False)
+        root = None
+        try:
+            parser.feed(html)
+            root = parser.close()
+        except etree.XMLSyntaxError:
+            pass
+        self.root = root if root is not None else etree.Element("html")
+
+    def select_one(self, selector: str) -> etree._Element | None:
+        nodes = _COMPILED[selector](self.root)
+        return nodes[0] if nodes else None
+
+    def select(self, selector: str) -> list[etree._Element]:
+        return _COMPILED[selector](self.root)
+
+    def node_text(self, node: etree._Element) -> str:
+        return _get_text(node)
+
+    def node_attr(self, node: etree._Element, name: str) -> str | None:
+        return node.get(name)
+
+    def script_text(self, node: etree._Element) -> str:
+        return node.text or ""
+
+    def strings(self) -> Iterator[tuple[str, Any]]:
+        top_level = [*reversed(list(self.root.itersiblings(preceding=True))), self.root, *self.root.itersiblings()]
+        for top in top_level:
+            # iter() is pre-order; a node's tail is due once the walk leaves its subtree.
+            open_nodes: list[etree._Element] = []
+            for node in top.iter():
+                parent = node.getparent()
+                while open_nodes and open_nodes[-1] is not parent:
+                    closed = open_nodes.pop()
+                    if closed.tail:
+                        yield closed.tail, closed.getparent()
+                if node.text:
+                    owner = node if isinstance(node.tag, str) else parent
+                    # Strings outside <html> belong to the document itself.
+                    yield node.text, self.root if owner is None else owner
+                if node is not top:
+                    open_nodes.append(node)
+            for closed in reversed(open_nodes):
+                if closed.tail:
+                    yield closed.tail, closed.getparent()
+
+
+BACKENDS: dict[str, Callable[[str], CourseDocument]] = {
+    "bs4": SoupDocument,
+    "lxml": LxmlDocument,
+}
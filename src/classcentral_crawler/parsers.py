@@ -1,141 +1,158 @@
 from __future__ import annotations
 
-import json
+import hashlib
 import re
+from dataclasses import fields
+from pathlib import Path
 from typing import Any
 from urllib.parse import urljoin
 
-from bs4 import BeautifulSoup
-
+from .extraction import Css, ExtractionPlan, Fact, Field, JsonLd
+from .jsonld import REQUIRED_FIELDS, record_from_jsonld, scan_course_jsonld
 from .models import CourseRecord
+from .parser_backends import BACKENDS
 
 
-def _text(soup: BeautifulSoup, selector: str) -> str | None:
-    node = soup.select_one(selector)
-    if not node:
-        return None
-    text = node.get_text(" ", strip=True)
-    return text or None
-
-
-def _extract_jsonld(soup: BeautifulSoup) -> dict[str, Any] | None:
-    for script in soup.select("script[type='application/ld+json']"):
-        raw = script.string or script.get_text(strip=True)
-        if not raw:
-            continue
-        try:
-            data = json.loads(raw)
-        except json.JSONDecodeError:
-            continue
-        candidates = data if isinstance(data, list) else [data]
-        for item in candidates:
-            if isinstance(item, dict) and item.get("@type") in {"Course", "EducationalOccupationalProgram", "Product"}:
-                return item
-    return None
-
-
-def parse_course(url: str, html: str, base_url: str) -> CourseRecord:
-    soup = BeautifulSoup(html, "lxml")
-    jsonld = _extract_jsonld(soup)
-
-    title = _text(soup, "h1") or (jsonld or {}).get("name")
-    description = _text(soup, "meta[name='description']") or (jsonld or {}).get("description")
-    if description and description.startswith("<meta"):
-        description = None
-
-    if not description:
-        meta_desc = soup.select_one("meta[name='description']")
-        if meta_desc:
-            description = meta_desc.get("content")
-
-    instructors = [n.get_text(" ", strip=True) for n in soup.select("[data-name='instructors'] a, .instructor a, .course-instructors a")]
-    instructors = [x for x in instructors if x]
-    if not instructors and jsonld:
-        teaches = jsonld.get("provider") or jsonld.get("creator")
-        if isinstance(teaches, dict):
-            name = teaches.get("name")
-            if name:
-                instructors = [name]
-
-    provider = _text(soup, "[data-name='provider'] a, .course-provider a, a[data-track*='provider']")
-    university = _text(soup, "[data-name='institution'] a, .course-institution a")
-
-    rating_text = _text(soup, "[itemprop='ratingValue'], .rating .value")
-    rating = None
-    if rating_text:
-        match = re.search(r"\d+(?:\.\d+)?", rating_text)
-        if match:
-            rating = float(match.group(0))
-    elif jsonld and isinstance(jsonld.get("aggregateRating"), dict):
-        rv = jsonld["aggregateRating"].get("ratingValue")
-        if rv:
-            rating = float(rv)
-
-    review_count = None
-    review_text = _text(soup, "[itemprop='reviewCount'], .rating .count")
-    if review_text:
-        digits = re.sub(r"\D", "", review_text)
-        if digits:
-            review_count = int(digits)
-    elif jsonld and isinstance(jsonld.get("aggregateRating"), dict):
-        rc = jsonld["aggregateRating"].get("reviewCount")
-        if rc:
-            review_count = int(str(rc))
-
-    enrollment_link = None
-    for selector in ["a[data-name='go-to-class']", "a.btn-go-to-class", "a[href*='classcentral.com/redirect']"]:
-        node = soup.select_one(selector)
-        if node and node.get("href"):
-            enrollment_link = urljoin(base_url, node["href"])
-            break
-
-    image_url = None
-    og_img = soup.select_one("meta[property='og:image']")
-    if og_img:
-        image_url = og_img.get("content")
-    if not image_url and jsonld and isinstance(jsonld.get("image"), str):
-        image_url = jsonld.get("image")
-
-    def grab_fact(label: str) -> str | None:
-        node = soup.find(string=re.compile(label, re.I))
-        if not node:
-            return None
-        if node.parent:
-            text = node.parent.get_text(" ", strip=True)
-            text = re.sub(label, "", text, flags=re.I).strip(" :-")
-            if text and len(text) < 200:
-                return text
-        return None
+def _not_meta_markup(value: Any) -> bool:
+    return not (isinstance(value, str) and value.startswith("<meta"))
+
+
+def _first_number(value: str, base_url: str) -> float | None:
+    match = re.search(r"\d+(?:\.\d+)?", value)
+    return float(match.group(0)) if match else None
+
 
-    language = grab_fact("Language")
-    level = grab_fact("Level")
-    duration = grab_fact("Duration")
-    price = grab_fact("Price")
-    certificate = grab_fact("Certificate")
-
-    if jsonld and not price:
-        offers = jsonld.get("offers")
-        if isinstance(offers, dict):
-            val = offers.get("price")
-            curr = offers.get("priceCurrency")
-            if val is not None:
-                price = f"{curr or ''} {val}".strip()
-
-    return CourseRecord(
-        url=url,
-        title=title,
-        provider_platform=provider,
-        university=university,
-        instructors=instructors,
-        description=description,
-        rating=rating,
-        review_count=review_count,
-        language=language,
-        level=level,
-        duration=duration,
-        price=price,
-        certificate_availability=certificate,
-        enrollment_link=enrollment_link,
-        image_url=image_url,
-        raw_jsonld=jsonld,
+def _digits(value: str, base_url: str) -> int | None:
+    digits = re.sub(r"\D", "", value)
+    return int(digits) if digits else None
+
+
+def _provider_name(value: Any, base_url: str) -> list[str]:
+    name = value.get("name") if isinstance(value, dict) else None
+    return [name] if name else []
+
+
+def _offer_price(offers: dict[str, Any], base_url: str) -> str | None:
+    val = offers.get("price")
+    if val is None:
+        return None
+    return f"{offers.get('priceCurrency') or ''} {val}".strip()
+
+
+# Tried in order per field; see extraction.Field for how a source "hits".
+COURSE_FIELDS = (
+    Field("title", (Css("h1"), JsonLd(("name",))), keep_empty=True),
+    Field("provider_platform", (Css("[data-name='provider'] a, .course-provider a, a[data-track*='provider']"),)),
+    Field("university", (Css("[data-name='institution'] a, .course-institution a"),)),
+    Field(
+        "instructors",
+        (
+            Css("[data-name='instructors'] a, .instructor a, .course-instructors a", all=True),
+            JsonLd(("provider", "creator"), post=_provider_name),
+        ),
+        default=list,
+    ),
+    Field(
+        "description",
+        (
+            Css("meta[name='description']", accept=_not_meta_markup),
+            JsonLd(("description",), accept=_not_meta_markup),
+            Css("meta[name='description']", attr="content"),
+        ),
+        keep_empty=True,
+    ),
+    Field(
+        "rating",
+        (
+            Css("[itemprop='ratingValue'], .rating .value", post=_first_number),
+            JsonLd(("aggregateRating.ratingValue",), post=lambda v, _: float(v)),
+        ),
+    ),
+    Field(
+        "review_count",
+        (
+            Css("[itemprop='reviewCount'], .rating .count", post=_digits),
+            JsonLd(("aggregateRating.reviewCount",), post=lambda v, _: int(str(v))),
+        ),
+    ),
+    Field("language", (Fact("Language"),)),
+    Field("level", (Fact("Level"),)),
+    Field("duration", (Fact("Duration"),)),
+    Field("price", (Fact("Price"), JsonLd(("offers",), post=_offer_price, accept=lambda v: v is None or isinstance(v, dict)))),
+    Field("certificate_availability", (Fact("Certificate"),)),
+    Field(
+        "enrollment_link",
+        tuple(
+            Css(selector, attr="href", post=lambda href, base_url: urljoin(base_url, href))
+            for selector in ("a[data-name='go-to-class']", "a.btn-go-to-class", "a[href*='classcentral.com/redirect']")
+        ),
+    ),
+    Field(
+        "image_url",
+        (
+            Css("meta[property='og:image']", attr="content"),
+            JsonLd(("image",), accept=lambda v: v is None or isinstance(v, str)),
+        ),
+        keep_empty=True,
+    ),
+    Field("raw_jsonld", (JsonLd(),)),
+)
+
+COURSE_PLAN = ExtractionPlan(COURSE_FIELDS)
+
+# Digest of every module that shapes a record, so any parser change invalidates stored records.
+_PARSER_SOURCE = hashlib.sha256(
+    b"".join(
+        (Path(__file__).parent / name).read_bytes()
+        for name in ("parsers.py", "extraction.py", "jsonld.py", "parser_backends.py", "models.py")
     )
+).hexdigest()[:16]
+
+
+def parser_version(jsonld_fast_path: bool = False) -> str:
+    """Tag stored with each record; a record under another tag was built by different parsing code."""
+    return f"{_PARSER_SOURCE}{'-jsonld' if jsonld_fast_path else ''}"
+
+
+def parse_course_content(
+    url: str,
+    content: bytes,
+    encoding: str,
+    base_url: str,
+    backend: str = "bs4",
+    jsonld_fast_path: bool = False,
+) -> tuple[CourseRecord, bool]:
+    """Parse a raw response body; the flag tells whether the DOM parse was skipped.
+
+    With ``jsonld_fast_path`` the page's JSON-LD is found by scanning the bytes
+    and wins over the DOM. Only when it lacks one of REQUIRED_FIELDS is the page
+    parsed in full, and then just to fill the fields still empty.
+    """
+    fast = scan_course_jsonld(content, encoding) if jsonld_fast_path else None
+    if fast is not None:
+        partial = record_from_jsonld(url, base_url, fast)
+        if all(getattr(partial, name) is not None for name in REQUIRED_FIELDS):
+            return partial, True
+    record = parse_course(url, content.decode(encoding, errors="replace"), base_url, backend)
+    if fast is not None:
+        for field in fields(CourseRecord):
+            if (value := getattr(partial, field.name)) not in (None, []):
+                setattr(record, field.name, value)
+    return record, False
+
+
+def parse_course_bytes(
+    url: str,
+    content: bytes,
+    encoding: str,
+    base_url: str,
+    backend: str = "bs4",
+    jsonld_fast_path: bool = False,
+) -> tuple[bytes, bool]:
+    """Process pool entry point: raw body in, compact serialized record out."""
+    record, fast = parse_course_content(url, content, encoding, base_url, backend, jsonld_fast_path)
+    return record.to_bytes(), fast
+
+
+def parse_course(url: str, html: str, base_url: str, backend: str = "bs4") -> CourseRecord:
+    return CourseRecord(url=url, **COURSE_PLAN.run(BACKENDS[backend](html), base_url))
@@ -1,19 +1,165 @@
 from __future__ import annotations
 
 import asyncio
+import logging
 import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+THROTTLE_STATUSES = {429, 503}
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
 
 
 class AsyncRateLimiter:
-    def __init__(self, requests_per_second: float) -> None:
+    """Token bucket allowing ``burst`` back-to-back requests, refilled at ``requests_per_second``.
+
+    Each caller reserves the next free slot without awaiting anything and then
+    sleeps until it, so concurrent waiters never queue behind each other's sleeps.
+    """
+
+    def __init__(self, requests_per_second: float, burst: int = 1) -> None:
         self._interval = 1.0 / requests_per_second if requests_per_second > 0 else 0
-        self._lock = asyncio.Lock()
-        self._last_call = 0.0
+        self._burst = max(1, burst)
+        # Theoretical arrival time of the next request once the bucket is drained.
+        self._next_slot = 0.0
+        self._paused_until = 0.0
+
+    @property
+    def rate(self) -> float:
+        return 1.0 / self._interval if self._interval else 0.0
 
     async def wait(self) -> None:
-        async with self._lock:
-            now = time.monotonic()
-            delta = now - self._last_call
-            if delta < self._interval:
-                await asyncio.sleep(self._interval - delta)
-            self._last_call = time.monotonic()
+        now = time.monotonic()
+        if not self._interval:
+            delay = self._paused_until - now
+        else:
+            slot = max(self._next_slot, now, self._paused_until)
+            self._next_slot = slot + self._interval
+            delay = max(slot - (self._burst - 1) * self._interval, self._paused_until) - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float) -> None:
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def record(self, status_code: int | None, latency: float, retry_after: float | None = None) -> None:
+        if retry_after and status_code in THROTTLE_STATUSES:
+            self.pause(retry_after)
+
+
+class AdaptiveRateLimiter(AsyncRateLimiter):
+    """AIMD rate control on top of the token bucket.
+
+    Healthy responses faster than ``latency_target`` raise the rate by
+    ``increase_per_sec`` every second; 429/503 responses multiply it by
+    ``decrease_factor`` (at most once per round of in-flight requests) and
+    honor ``Retry-After``. The rate always stays within ``[min_rate, max_rate]``.
+    """
+
+    def __init__(
+        self,
+        requests_per_second: float,
+        burst: int = 1,
+        *,
+        min_rate: float,
+        max_rate: float,
+        increase_per_sec: float,
+        decrease_factor: float,
+        latency_target: float,
+    ) -> None:
+        self._min_rate = min_rate
+        self._max_rate = max_rate
+        super().__init__(self._clamp(requests_per_second), burst)
+        self._increase_per_sec = increase_per_sec
+        self._decrease_factor = decrease_factor
+        self._latency_target = latency_target
+        self._last_decrease = 0.0
+
+    def _clamp(self, rate: float) -> float:
+        return min(self._max_rate, max(self._min_rate, rate))
+
+    def _set_rate(self, rate: float) -> None:
+        self._interval = 1.0 / self._clamp(rate)
+
+    def record(self, status_code: int | None, latency: float, retry_after: float | None = None) -> None:
+        super().record(status_code, latency, retry_after)
+        now = time.monotonic()
+        if status_code in THROTTLE_STATUSES:
+            # Requests sent before the last cut were paced at the old rate; don't punish twice.
+            if now - latency < self._last_decrease:
+                return
+            self._last_decrease = now
+            self._set_rate(self.rate * self._decrease_factor)
+            logger.info("Throttled (%s), rate lowered to %.2f req/s", status_code, self.rate)
+            return
+        if status_code is None or status_code >= 400 or latency > self._latency_target:
+            return
+        # +increase_per_sec per second of healthy traffic, whatever the current rate.
+        self._set_rate(self.rate + self._increase_per_sec / self.rate)
+
+
+class HostLimiterRegistry:
+    """Rate limiter and concurrency cap per host.
+
+    The main site (``primary_host`` and its subdomains) uses ``primary``; every
+    other host lazily gets its own limiter at ``host_rates[host]`` or
+    ``default_rate``, so off-site traffic neither starves nor drains the main budget.
+    """
+
+    def __init__(
+        self,
+        primary_host: str,
+        primary: AsyncRateLimiter,
+        primary_concurrency: int,
+        *,
+        default_rate: float,
+        default_concurrency: int,
+        host_rates: dict[str, float] | None = None,
+    ) -> None:
+        self._primary_domain = primary_host.lower().removeprefix("www.")
+        self._default_rate = default_rate
+        self._default_concurrency = default_concurrency
+        self._host_rates = {h.lower(): r for h, r in (host_rates or {}).items()}
+        self._limits: dict[str, tuple[AsyncRateLimiter, asyncio.Semaphore]] = {
+            self._primary_domain: (primary, asyncio.Semaphore(primary_concurrency)),
+        }
+
+    def _host_key(self, url: str) -> str:
+        host = (urlparse(url).hostname or "").lower()
+        if host == self._primary_domain or host.endswith(f".{self._primary_domain}"):
+            return self._primary_domain
+        return host
+
+    def _get(self, host: str) -> tuple[AsyncRateLimiter, asyncio.Semaphore]:
+        limits = self._limits.get(host)
+        if limits is None:
+            rate = self._host_rates.get(host, self._default_rate)
+            limits = (AsyncRateLimiter(rate), asyncio.Semaphore(self._default_concurrency))
+            self._limits[host] = limits
+        return limits
+
+    @asynccontextmanager
+    async def slot(self, url: str) -> AsyncIterator[AsyncRateLimiter]:
+        limiter, semaphore = self._get(self._host_key(url))
+        async with semaphore:
+            await limiter.wait()
+            yield limiter
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass
+
+from lxml import etree
+
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+@dataclass(slots=True)
+class SitemapEntry:
+    loc: str
+    lastmod: str | None = None
+    is_sitemap: bool = False
+
+
+class SitemapParser:
+    """Incremental parser for ``<urlset>`` and ``<sitemapindex>`` documents.
+
+    Raw bytes are fed as they arrive; gzip is detected from the magic bytes so
+    both ``.xml`` and ``.xml.gz`` work. Parsed elements are discarded right
+    away, keeping memory flat for sitemaps with tens of thousands of entries.
+    """
+
+    def __init__(self) -> None:
+        self._parser = etree.XMLPullParser(events=("end",), resolve_entities=False, huge_tree=True)
+        self._gunzip: zlib._Decompress | None = None
+        self._started = False
+
+    def feed(self, chunk: bytes) -> list[SitemapEntry]:
+        if not self._started:
+            self._started = True
+            if chunk.startswith(_GZIP_MAGIC):
+                self._gunzip = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._gunzip is not None:
+            chunk = self._gunzip.decompress(chunk)
+        self._parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> list[SitemapEntry]:
+        if self._gunzip is not None:
+            self._parser.feed(self._gunzip.flush())
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> list[SitemapEntry]:
+        entries: list[SitemapEntry] = []
+        for _, element in self._parser.read_events():
+            tag = etree.QName(element).localname
+            if tag not in {"url", "sitemap"}:
+                continue
+            fields = {etree.QName(child).localname: (child.text or "").strip() for child in element}
+            if fields.get("loc"):
+                entries.append(SitemapEntry(fields["loc"], fields.get("lastmod") or None, tag == "sitemap"))
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+        return entries
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from .models import CourseRecord
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS courses (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    last_modified TEXT,
+    record BLOB NOT NULL,
+    fetched_at REAL NOT NULL,
+    checked_at REAL NOT NULL,
+    lastmod TEXT,
+    parser_version TEXT
+);
+"""
+
+
+def _parse_lastmod(value: str) -> datetime | None:
+    try:
+        return datetime.fromisoformat(value.strip())
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True)
+class CourseState:
+    url: str
+    etag: str | None
+    last_modified: str | None
+    record: CourseRecord
+    lastmod: str | None = None
+    parser_version: str | None = None
+
+    def unchanged_since(self, lastmod: str | None) -> bool:
+        """True if ``lastmod`` (e.g. from a sitemap) is not newer than the one this record was crawled at."""
+        if not lastmod or not self.lastmod:
+            return False
+        new, old = _parse_lastmod(lastmod), _parse_lastmod(self.lastmod)
+        if new is None or old is None or (new.tzinfo is None) != (old.tzinfo is None):
+            return lastmod == self.lastmod
+        return new <= old
+
+    def conditional_headers(self) -> dict[str, str]:
+        headers: dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class CrawlState:
+    """Per-URL index of the last parsed record and its HTTP validators, kept across runs."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(courses)")}
+        if "lastmod" not in columns:
+            self._db.execute("ALTER TABLE courses ADD COLUMN lastmod TEXT")
+        if "parser_version" not in columns:
+            self._db.execute("ALTER TABLE courses ADD COLUMN parser_version TEXT")
+
+    def get(self, url: str) -> CourseState | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified, record, lastmod, parser_version FROM courses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, record, lastmod, parser_version = row
+        return CourseState(url, etag, last_modified, CourseRecord.from_bytes(record), lastmod, parser_version)
+
+    def put(
+        self,
+        record: CourseRecord,
+        etag: str | None,
+        last_modified: str | None,
+        lastmod: str | None = None,
+        parser_version: str | None = None,
+    ) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO courses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (record.url, etag, last_modified, record.to_bytes(), now, now, lastmod, parser_version),
+            )
+            self._db.commit()
+
+    def touch(self, url: str, lastmod: str | None = None) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE courses SET checked_at = ?, lastmod = COALESCE(?, lastmod) WHERE url = ?",
+                (time.time(), lastmod, url),
+            )
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()